@@ -0,0 +1,45 @@
+"""
+Compares the MP3 -> WAV decoders used by the Common Voice extractor.
+
+    python -m benchmarks.decode_benchmark data/common_voice/clips --limit 500
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from src.extractors.utils import AudioDecoder, FFmpegDecoder, SoundFileDecoder
+
+
+def benchmark(decoder: AudioDecoder, clips: list[bytes]) -> tuple[float, int]:
+    start = time.perf_counter()
+    total = 0
+    for clip in clips:
+        total += len(decoder.to_wav(clip))
+    return time.perf_counter() - start, total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("clips_dir", type=Path)
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    paths = sorted(args.clips_dir.glob("*.mp3"))[: args.limit]
+    if not paths:
+        raise FileNotFoundError(f"No mp3 clips found in {args.clips_dir}")
+    clips = [path.read_bytes() for path in paths]
+
+    for name, decoder in [
+        ("ffmpeg", FFmpegDecoder()),
+        ("soundfile", SoundFileDecoder()),
+    ]:
+        seconds, total = benchmark(decoder, clips)
+        print(
+            f"{name:>10}: {len(clips)} clips in {seconds:.2f}s "
+            f"({len(clips) / seconds:.1f} clips/s, {total / 1024**2:.1f} MB of WAV)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compares the HTML parsers available to the crawlers on saved pages, e.g.
+the bodies stored by the HTTP cache. Without a directory it runs on the
+test fixtures, which the parity tests check with both parsers.
+
+    python -m benchmarks.html_parse_benchmark data/http_cache --limit 200
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from bs4.builder import builder_registry
+
+from src.scraping.html_parser import parse_html
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures" / "html"
+
+
+def benchmark(parser: str, pages: list[str]) -> tuple[float, int]:
+    start = time.perf_counter()
+    links = 0
+    for page in pages:
+        links += len(parse_html(page, parser).find_all("a"))
+    return time.perf_counter() - start, links
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pages_dir", type=Path, nargs="?", default=FIXTURES)
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    paths = [*args.pages_dir.rglob("*.body"), *args.pages_dir.rglob("*.html")]
+    paths = sorted(paths)[: args.limit]
+    if not paths:
+        raise FileNotFoundError(f"No saved pages found in {args.pages_dir}")
+    # the crawlers parse decoded text
+    pages = [path.read_text(errors="replace") for path in paths]
+    size = sum(len(page) for page in pages) / 1024**2
+
+    for name in ["html.parser", "lxml"]:
+        if builder_registry.lookup(name) is None:
+            print(f"{name:>12}: not installed")
+            continue
+        seconds, links = benchmark(name, pages)
+        print(
+            f"{name:>12}: {len(pages)} pages ({size:.1f} MB) in {seconds:.2f}s "
+            f"({len(pages) / seconds:.1f} pages/s, {links} links)"
+        )
+
+
+if __name__ == "__main__":
+    main()
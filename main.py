@@ -1,3 +1,5 @@
+import os
+
 import structlog
 from sqlalchemy.orm import sessionmaker
 
@@ -6,21 +8,45 @@ from metadata.os_metadata import (
     FLEURS_METADATA,
     VOXPOPULI_METADATA,
 )
-from src.database import Base, engine
+from src.database import Base, BulkWriter, engine, upgrade_schema
 from src.extractors import CommonVoice, Fleurs, VoxPopuli
+from src.storage import BlobStore
 
 logger = structlog.get_logger(level="INFO")
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
 s_maker = sessionmaker(bind=engine)
 
+# set to a BlobStore("data/audio_store") to keep audio outside of PostgreSQL
+BLOB_STORE: BlobStore | None = None
+
 
-def insert(extractor):
+def insert(extractor, batch_size: int = 500, workers: int | None = None):
     with s_maker() as session:
-        for count, recording in enumerate(extractor.extract()):
-            session.add(recording)
-            if count % 50:
-                session.commit()
-        session.commit()
+        extractor.resume(session)
+        logger.info(
+            f"Resuming from row {extractor.start_row}",
+            already_ingested=len(extractor.existing),
+        )
+
+        if workers:
+            recordings = extractor.extract_parallel(workers=workers)
+        else:
+            recordings = extractor.extract()
+
+        writer = BulkWriter(
+            session,
+            batch_size=batch_size,
+            method="copy",
+            blob_store=BLOB_STORE,
+            on_flush=extractor.save_checkpoint,
+        )
+        stats = writer.write(recordings)
+        logger.info(
+            f"Inserted {stats.rows} rows",
+            rows_per_s=round(stats.rows_per_s, 1),
+            mb_per_s=round(stats.mb_per_s, 2),
+        )
 
 
 def extract_data():
@@ -32,9 +58,9 @@ def extract_data():
 
     logger.info("Processing Common Voice")
     for i in COMMON_VOICE_METADATA:
-        a = CommonVoice(i)
+        a = CommonVoice(i, decoder="soundfile")
         logger.info(f"Processing {i.source_part}")
-        insert(a)
+        insert(a, workers=os.cpu_count())
 
     logger.info("Processing Voxpopuli")
     for i in VOXPOPULI_METADATA:
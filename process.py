@@ -9,20 +9,29 @@ import structlog
 from aiohttp import ClientSession
 from sqlalchemy.orm import sessionmaker
 
-from src.database import Base, async_engine, engine
+from src.database import Base, async_engine, engine, upgrade_schema
 from src.runners import (
     AlignerRunner,
+    BlobMigrationRunner,
+    ExportRunner,
     ParserRunner,
     TikaRunner,
+    TranscodeRunner,
     VadRunner,
     WerRunner,
     init_db,
 )
+from src.storage import AudioCache, BlobStore
 
 structlog.configure(
     wrapper_class=structlog.make_filtering_bound_logger(logging.DEBUG),
 )
 
+# decoded 16 kHz audio shared by VAD, transcription, alignment and export
+PCM_CACHE = "data/pcm_cache"
+# content-addressed audio of the `recording` rows, see main.BLOB_STORE
+BLOB_ROOT = "data/audio_store"
+
 
 def with_client_session(func):
     """Decorator to provide an async ClientSession to the wrapped function."""
@@ -36,14 +45,17 @@ def with_client_session(func):
 
 
 @with_client_session
-async def tika(client: ClientSession | None = None):
+async def tika(client: ClientSession | None = None, native: bool = False):
     if not client:
         raise Exception("Client is None")
     session_maker = await init_db(engine=async_engine, Base=Base)
 
-    async with session_maker() as session:
-        runner = TikaRunner("http://localhost:9998/tika", session, client)
-        await runner.run_tika(parallel=20, total=2111)
+    runner = TikaRunner(
+        "http://localhost:9998/tika", session_maker, client, native=native
+    )
+    if native:
+        await runner.check_parity()
+    await runner.run_tika(parallel=20)
 
 
 def parse_to_json():
@@ -55,11 +67,20 @@ def parse_to_json():
         runner.run(10)
 
 
+def parse_docx_to_json(store_xhtml: bool = False):
+    Base.metadata.create_all(bind=engine)
+    s_maker = sessionmaker(bind=engine)
+
+    with s_maker() as session:
+        runner = ParserRunner(session)
+        runner.run_fused(10, store_xhtml=store_xhtml)
+
+
 def apply_vad():
     Base.metadata.create_all(bind=engine)
     s_maker = sessionmaker(bind=engine)
     with s_maker() as session:
-        runner = VadRunner(session)
+        runner = VadRunner(session, cache=AudioCache(PCM_CACHE))
 
     runner.run()
 
@@ -76,7 +97,36 @@ def run_alignment():
     Base.metadata.create_all(bind=engine)
     s_maker = sessionmaker(bind=engine)
     with s_maker() as session:
-        runner = AlignerRunner(session=session)
+        runner = AlignerRunner(session=session, cache=AudioCache(PCM_CACHE))
+        runner.run()
+
+
+def migrate_audio(store_path: str = BLOB_ROOT):
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    s_maker = sessionmaker(bind=engine)
+    with s_maker() as session:
+        runner = BlobMigrationRunner(session, BlobStore(store_path))
+        runner.run()
+
+
+def export_shards(output_dir: str = "data/export", shard_format: str = "tar"):
+    s_maker = sessionmaker(bind=engine)
+    with s_maker() as session:
+        runner = ExportRunner(
+            session,
+            output_dir,
+            shard_format=shard_format,  # type: ignore
+            blob_root=BLOB_ROOT,
+            cache_root=PCM_CACHE,
+        )
+        runner.run()
+
+
+def transcode_archive(profile: str = "flac"):
+    s_maker = sessionmaker(bind=engine)
+    with s_maker() as session:
+        runner = TranscodeRunner(session, profile=profile)
         runner.run()
 
 
@@ -85,5 +135,10 @@ run_alignment()
 
 # apply_vad()
 # parse_to_json()
+# parse_docx_to_json()
 
 # asyncio.run(tika())
+# asyncio.run(tika(native=True))
+# migrate_audio()
+# export_shards()
+# transcode_archive()
@@ -8,21 +8,33 @@ from aiohttp import ClientSession
 from metadata.scraping_metadata import dl_links, members_links, recording_links
 from src.database import Base, async_engine
 from src.redis_client import async_redis_client
-from src.runners import ScraperRunner, init_db
+from src.runners import PipelineStage, ScraperRunner, init_db
+from src.scraping.browser_pool import BrowserPool
+from src.scraping.http_cache import HTTPCache
 from src.scraping.link_queue import LinkQueue
+from src.scraping.rate_limiter import RateLimiter
 
 structlog.configure(
     wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
 )
 logger = structlog.get_logger()
 
+# politeness budget shared by all workers, per host. The media host gets the
+# segment rate of VideoDownloader, unless it is pinned in the overrides.
+rate_limiter = RateLimiter(rate=1.0, burst=2, overrides={})
+# offline=True replays from the cache only, anything missing fails instead of
+# going to the network, e.g. for parser development
+http_cache = HTTPCache("data/http_cache", offline=False)
+# headless browser shared by the term listing workers
+browser_pool = BrowserPool(contexts=5)
+
 
 def with_client_session(func):
     """Decorator to provide an async ClientSession to the wrapped function."""
 
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        async with ClientSession() as client:
+        async with ClientSession(trace_configs=[rate_limiter.trace_config()]) as client:
             return await func(client, *args, **kwargs)
 
     return wrapper
@@ -35,59 +47,84 @@ async def main(client: ClientSession | None = None):
 
     session_maker = await init_db(engine=async_engine, Base=Base)
 
-    meetings_queue = LinkQueue("terms", async_redis_client)
-    transcripts_queue = LinkQueue("transcripts", async_redis_client)
+    # blocking queues, the workers stop on the end-of-stream markers
+    meetings_queue = LinkQueue("terms", async_redis_client, pop_timeout=0)
+    transcripts_queue = LinkQueue("transcripts", async_redis_client, pop_timeout=0)
 
-    recording_list = LinkQueue("recordings_list", async_redis_client)
-    recording_pages = LinkQueue("recording_pages", async_redis_client)
-    video_recordings = LinkQueue("video_recordings", async_redis_client)
-    nrsr_members_queue = LinkQueue("nrsr_members", async_redis_client)
+    recording_list = LinkQueue("recordings_list", async_redis_client, pop_timeout=0)
+    recording_pages = LinkQueue("recording_pages", async_redis_client, pop_timeout=0)
+    video_recordings = LinkQueue("video_recordings", async_redis_client, pop_timeout=0)
+    nrsr_members_queue = LinkQueue("nrsr_members", async_redis_client, pop_timeout=0)
 
     await meetings_queue.add(dl_links)
     await recording_list.add(recording_links)
     await nrsr_members_queue.add(members_links)
 
-    runner = ScraperRunner(session_maker)
-
-    meetings_tasks = [
-        runner.terms_task(source_queue=meetings_queue, target_queue=transcripts_queue)
-        for _ in range(5)
-    ]
-
-    await runner.run_tasks(meetings_tasks)
-
-    transcript_tasks = [
-        runner.transcript_task(source_queue=transcripts_queue, http_client=client)
-        for _ in range(5)
-    ]
-
-    await runner.run_tasks(transcript_tasks)
-    recording_list_tasks = [
-        runner.list_recordings_task(recording_list, recording_pages, http_client=client)
-        for _ in range(5)
-    ]
-
-    await runner.run_tasks(recording_list_tasks)
-    video_recordings_tasks = [
-        runner.list_video_recordings_task(
-            recording_pages, video_recordings, http_client=client
+    runner = ScraperRunner(
+        session_maker,
+        rate_limiter=rate_limiter,
+        http_cache=http_cache,
+        browser_pool=browser_pool,
+    )
+
+    await browser_pool.start()
+    try:
+        await runner.run_pipeline(
+            [
+                PipelineStage(
+                    name="terms",
+                    source_queue=meetings_queue,
+                    target_queue=transcripts_queue,
+                    workers=5,
+                    task=lambda: runner.terms_task(meetings_queue, transcripts_queue),
+                ),
+                PipelineStage(
+                    name="transcripts",
+                    source_queue=transcripts_queue,
+                    target_queue=None,
+                    workers=5,
+                    task=lambda: runner.transcript_task(transcripts_queue, client),
+                ),
+                PipelineStage(
+                    name="recording_list",
+                    source_queue=recording_list,
+                    target_queue=recording_pages,
+                    workers=5,
+                    task=lambda: runner.list_recordings_task(
+                        recording_list, recording_pages, http_client=client
+                    ),
+                ),
+                PipelineStage(
+                    name="recording_pages",
+                    source_queue=recording_pages,
+                    target_queue=video_recordings,
+                    workers=5,
+                    task=lambda: runner.list_video_recordings_task(
+                        recording_pages, video_recordings, http_client=client
+                    ),
+                ),
+                PipelineStage(
+                    name="video_recordings",
+                    source_queue=video_recordings,
+                    target_queue=None,
+                    workers=5,
+                    task=lambda: runner.download_video_recordings(
+                        video_recordings, client
+                    ),
+                ),
+                PipelineStage(
+                    name="nrsr_members",
+                    source_queue=nrsr_members_queue,
+                    target_queue=None,
+                    workers=5,
+                    task=lambda: runner.get_nrsr_members(
+                        nrsr_members_queue, client, redis=async_redis_client
+                    ),
+                ),
+            ]
         )
-        for _ in range(5)
-    ]
-    await runner.run_tasks(video_recordings_tasks)
-
-    video_downloading_tasks = [
-        runner.download_video_recordings(video_recordings, client) for _ in range(5)
-    ]
-
-    await runner.run_tasks(video_downloading_tasks)
-
-    member_scraping_tasks = [
-        runner.get_nrsr_members(nrsr_members_queue, client, redis=async_redis_client)
-        for _ in range(5)
-    ]
-
-    await runner.run_tasks(member_scraping_tasks)
+    finally:
+        await browser_pool.stop()
 
 
 asyncio.run(main())
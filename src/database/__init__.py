@@ -1,3 +1,12 @@
 from .async_engine import async_engine
+from .bulk_writer import BulkWriter, BulkWriteStats
 from .engine import engine
-from .models import Base, NRSRTranscript, Recording, NRSRRecording, Members
+from .migrations import upgrade_schema
+from .models import (
+    Base,
+    ExtractionCheckpoint,
+    Members,
+    NRSRRecording,
+    NRSRTranscript,
+    Recording,
+)
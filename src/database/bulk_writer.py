@@ -0,0 +1,160 @@
+import time
+from io import StringIO
+from typing import Any, Callable, Iterable, Literal
+
+import structlog
+import ujson
+from pydantic import BaseModel, computed_field
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..storage import BlobStore
+from .models import Recording
+
+logger = structlog.get_logger()
+
+
+class BulkWriteStats(BaseModel):
+    rows: int = 0
+    audio_bytes: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @computed_field
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @computed_field
+    @property
+    def mb_per_s(self) -> float:
+        return self.audio_bytes / 1024**2 / self.seconds if self.seconds else 0.0
+
+
+class BulkWriter:
+    """
+    Collects recordings into batches and writes every batch with a single
+    statement (PostgreSQL COPY or executemany) followed by a single commit.
+    """
+
+    session: Session
+    batch_size: int
+    method: Literal["copy", "executemany"]
+    stats: BulkWriteStats
+    columns: list[str]
+    blob_store: BlobStore | None
+    # called in the transaction of every batch, before its commit
+    on_flush: Callable[[Session], None] | None
+
+    def __init__(
+        self,
+        session: Session,
+        batch_size: int = 500,
+        method: Literal["copy", "executemany"] = "copy",
+        blob_store: BlobStore | None = None,
+        on_flush: Callable[[Session], None] | None = None,
+    ) -> None:
+        self.session = session
+        self.batch_size = batch_size
+        self.method = method
+        self.blob_store = blob_store
+        self.on_flush = on_flush
+        self.stats = BulkWriteStats()
+        self.columns = [
+            column.key for column in Recording.__table__.columns if column.key != "id"
+        ]
+        self.batch: list[dict[str, Any]] = []
+
+    def write(self, recordings: Iterable[Recording | dict[str, Any]]) -> BulkWriteStats:
+        for recording in recordings:
+            self.add(recording)
+        self.flush()
+        return self.stats
+
+    def add(self, recording: Recording | dict[str, Any]):
+        self.batch.append(self.to_row(recording))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.batch and self.on_flush is None:
+            return
+
+        start = time.perf_counter()
+        if self.batch and self.method == "copy":
+            self.copy(self.batch)
+        elif self.batch:
+            self.session.execute(insert(Recording), self.batch)
+        if self.on_flush is not None:
+            self.on_flush(self.session)
+        self.session.commit()
+        elapsed = time.perf_counter() - start
+
+        if not self.batch:
+            return
+
+        self.stats.rows += len(self.batch)
+        self.stats.audio_bytes += sum(row["audio_length"] or 0 for row in self.batch)
+        self.stats.batches += 1
+        self.stats.seconds += elapsed
+
+        logger.debug(
+            "Batch written",
+            rows=len(self.batch),
+            seconds=round(elapsed, 3),
+            rows_per_s=round(self.stats.rows_per_s, 1),
+            mb_per_s=round(self.stats.mb_per_s, 2),
+        )
+        self.batch = []
+
+    def to_row(self, recording: Recording | dict[str, Any]) -> dict[str, Any]:
+        if isinstance(recording, dict):
+            row = {column: recording.get(column) for column in self.columns}
+        else:
+            row = {column: getattr(recording, column) for column in self.columns}
+
+        if row["audio"] is not None:
+            row["audio_length"] = len(row["audio"])
+
+            if self.blob_store is not None:
+                ref = self.blob_store.put(row["audio"])
+                row["audio"] = None
+                row["audio_hash"] = ref.hash
+                row["audio_offset"] = ref.offset
+        return row
+
+    def copy(self, rows: list[dict[str, Any]]):
+        buffer = StringIO()
+        for row in rows:
+            buffer.write(
+                "\t".join(self.copy_value(row[column]) for column in self.columns)
+            )
+            buffer.write("\n")
+        buffer.seek(0)
+
+        dbapi_connection = self.session.connection().connection.dbapi_connection
+        with dbapi_connection.cursor() as cursor:  # type: ignore
+            cursor.copy_expert(
+                f"COPY {Recording.__tablename__} ({', '.join(self.columns)}) "
+                "FROM STDIN WITH (FORMAT text)",
+                buffer,
+            )
+
+    @staticmethod
+    def copy_value(value: Any) -> str:
+        """
+        Encodes a single value for the COPY text format.
+        """
+        if value is None:
+            return "\\N"
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return "\\\\x" + bytes(value).hex()
+        if isinstance(value, (dict, list)):
+            value = ujson.dumps(value, ensure_ascii=False)
+        return (
+            str(value)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
@@ -0,0 +1,17 @@
+from sqlalchemy import Engine, text
+
+# `create_all` only creates missing tables, columns added to existing
+# tables are brought in by these idempotent statements
+RECORDING_BLOB_COLUMNS = [
+    "ALTER TABLE recording ALTER COLUMN audio DROP NOT NULL",
+    "ALTER TABLE recording ADD COLUMN IF NOT EXISTS audio_hash VARCHAR",
+    "ALTER TABLE recording ADD COLUMN IF NOT EXISTS audio_offset BIGINT",
+    "ALTER TABLE recording ADD COLUMN IF NOT EXISTS audio_length BIGINT",
+    "CREATE INDEX IF NOT EXISTS ix_recording_audio_hash ON recording (audio_hash)",
+]
+
+
+def upgrade_schema(engine: Engine):
+    with engine.begin() as connection:
+        for statement in RECORDING_BLOB_COLUMNS:
+            connection.execute(text(statement))
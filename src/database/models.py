@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    BigInteger,
     Column,
     Date,
     Float,
@@ -18,7 +19,12 @@ class Recording(Base):
     id = Column(Integer, primary_key=True)
     filename = Column(String, nullable=False, unique=True)
     transcript = Column(String)
-    audio = Column(LargeBinary, nullable=False)
+    # either `audio` holds the clip or it lives in the external blob store
+    # under `audio_hash` at `audio_offset`
+    audio = Column(LargeBinary)
+    audio_hash = Column(String, index=True)
+    audio_offset = Column(BigInteger)
+    audio_length = Column(BigInteger)
     source = Column(String, nullable=False)
     source_part = Column(String)
     duration_ms = Column(Float, nullable=False)
@@ -68,3 +74,11 @@ class Members(Base):
     name = Column(String)
     surname = Column(String)
     term = Column(Integer)
+
+
+class ExtractionCheckpoint(Base):
+    __tablename__ = "extraction_checkpoint"
+
+    source = Column(String, primary_key=True)
+    source_part = Column(String, primary_key=True)
+    rows_done = Column(Integer, nullable=False)
@@ -0,0 +1,6 @@
+from .shard_writer import (
+    SHARD_WRITERS,
+    ParquetShardWriter,
+    ShardWriter,
+    TarShardWriter,
+)
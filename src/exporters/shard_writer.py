@@ -0,0 +1,166 @@
+import os
+import tarfile
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+import ujson
+
+
+class ShardWriter(ABC):
+    """
+    Writes one shard of audio samples with their JSON metadata. The shard
+    is written under a temporary name and renamed when closed, so a shard
+    present under its final name is always complete.
+    """
+
+    extension: str
+    path: Path
+    tmp_path: Path
+    count: int
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.tmp_path = path.with_name(f"{path.name}.tmp")
+        self.count = 0
+
+    @abstractmethod
+    def add(
+        self,
+        key: str,
+        audio: bytes | memoryview,
+        audio_format: str,
+        meta: dict[str, Any],
+    ): ...
+
+    @abstractmethod
+    def finalize(self): ...
+
+    def close(self):
+        self.finalize()
+        os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.finalize()
+            self.tmp_path.unlink(missing_ok=True)
+
+
+class BufferReader:
+    """
+    Minimal file object over a buffer for `tarfile`. Reads return views,
+    so a memory-mapped blob goes into the tar without a copy.
+    """
+
+    def __init__(self, data: bytes | memoryview) -> None:
+        self.view = memoryview(data).cast("B")
+        self.position = 0
+
+    def read(self, size: int = -1) -> memoryview:
+        end = len(self.view) if size < 0 else self.position + size
+        chunk = self.view[self.position : end]
+        self.position += len(chunk)
+        return chunk
+
+
+class TarShardWriter(ShardWriter):
+    """
+    WebDataset layout: every sample is a `{key}.{audio_format}` member
+    followed by a `{key}.json` member.
+    """
+
+    extension = "tar"
+    tar: tarfile.TarFile
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        self.tar = tarfile.open(self.tmp_path, "w")
+
+    def add(
+        self,
+        key: str,
+        audio: bytes | memoryview,
+        audio_format: str,
+        meta: dict[str, Any],
+    ):
+        self._add_member(f"{key}.{audio_format}", audio)
+        self._add_member(f"{key}.json", ujson.dumps(meta, ensure_ascii=False).encode())
+        self.count += 1
+
+    def _add_member(self, name: str, data: bytes | memoryview):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self.tar.addfile(info, BufferReader(data))
+
+    def finalize(self):
+        self.tar.close()
+
+
+class ParquetShardWriter(ShardWriter):
+    """
+    One row per sample with `key`, `audio`, `audio_format` and `json`
+    columns, flushed in row groups of `row_group_size` samples.
+    """
+
+    extension = "parquet"
+
+    def __init__(self, path: Path, row_group_size: int = 256) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        super().__init__(path)
+        self.pa = pa
+        self.schema = pa.schema(
+            [
+                ("key", pa.string()),
+                ("audio", pa.binary()),
+                ("audio_format", pa.string()),
+                ("json", pa.string()),
+            ]
+        )
+        self.writer = pq.ParquetWriter(self.tmp_path, self.schema)
+        self.row_group_size = row_group_size
+        self.rows: list[dict[str, Any]] = []
+
+    def add(
+        self,
+        key: str,
+        audio: bytes | memoryview,
+        audio_format: str,
+        meta: dict[str, Any],
+    ):
+        self.rows.append(
+            {
+                "key": key,
+                # arrow copies the value into its own buffers either way
+                "audio": bytes(audio),
+                "audio_format": audio_format,
+                "json": ujson.dumps(meta, ensure_ascii=False),
+            }
+        )
+        self.count += 1
+        if len(self.rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self.rows:
+            table = self.pa.Table.from_pylist(self.rows, schema=self.schema)
+            self.writer.write_table(table)
+            self.rows = []
+
+    def finalize(self):
+        self._flush()
+        self.writer.close()
+
+
+SHARD_WRITERS: dict[str, type[ShardWriter]] = {
+    "tar": TarShardWriter,
+    "parquet": ParquetShardWriter,
+}
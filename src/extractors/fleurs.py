@@ -1,52 +1,48 @@
 import os
+from typing import Hashable
 
-import numpy as np
-import pandas as pd
-from pandas import Series
+from pandas import DataFrame
 
 from src.database import Recording
 from src.extractors.utils import AudioAnalyzer
 
 from ..schemas import DataMetaData
-from .parent import Extractor
+from .parent import Extractor, ManifestRow
 
 
 class Fleurs(Extractor):
+    filename_column = 1
+    transcript_column = 2
+    gender_column = 6
+    header = None
+
     def __init__(
         self, data: DataMetaData, source: str = "fleurs", *args, **kwargs
     ) -> None:
         super().__init__(data, source, *args, **kwargs)
-        self.data = pd.read_csv(self.data_path, delimiter="\t", header=None)
 
-    def construct_recording(self, data: Series) -> Recording:
-        data = data.replace(np.nan, None)
+    def other_columns(self, data: DataFrame) -> list[Hashable]:
+        return list(range(7))
 
-        filename = data[1]
-        _path = self.get_path_to_audio(filename)
-        transcript = data[2]
+    def construct_recording(self, data: ManifestRow) -> Recording:
+        _path = self.check_path(data.path)
         audio = open(_path, "rb").read()
         audio_size = os.path.getsize(_path) / 1024**2
-        speaker_id = None
-        gender = data[6]
 
-        _analyzed = AudioAnalyzer(audio).analyze()
+        _analyzed = AudioAnalyzer(_path).analyze()
         duration_ms = _analyzed.duration
         sampling_rate = _analyzed.sampling_rate
 
-        _other_cols = [col for col in range(7) if col not in {1, 2, 6}]
-
-        other_data = {col_name: data[col_name] for col_name in _other_cols}
-
         return Recording(
-            filename=filename,
-            transcript=transcript,
+            filename=data.filename,
+            transcript=data.transcript,
             audio=audio,
             source=self.source,
             source_part=self.source_part,
             duration_ms=duration_ms,
             audio_size=audio_size,
-            speaker_id=speaker_id,
-            speaker_gender=gender,
+            speaker_id=None,
+            speaker_gender=data.speaker_gender,
             sampling_rate=sampling_rate,
-            other_data=other_data,
+            other_data=data.other_data,
         )
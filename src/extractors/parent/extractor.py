@@ -1,35 +1,264 @@
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
+from typing import Any, Generator, Hashable, Iterator, NamedTuple
 
+import pandas as pd
 from pandas import DataFrame, Series
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 from tqdm import tqdm
 
-from src.database import Recording
+from src.database import ExtractionCheckpoint, Recording
 from src.schemas import DataMetaData
 
 
+class ManifestRow(NamedTuple):
+    filename: str
+    path: str
+    transcript: str | None
+    speaker_id: str | None
+    speaker_gender: str | None
+    other_data: dict[Hashable, Any]
+
+
+# extractor instance living in a worker process of `Extractor.extract_parallel`
+_worker_extractor: "Extractor | None" = None
+
+
+def _init_worker(extractor: "Extractor"):
+    global _worker_extractor
+    _worker_extractor = extractor
+
+
+def _construct_chunk(rows: list[ManifestRow]) -> list[Recording]:
+    if _worker_extractor is None:
+        raise RuntimeError("Worker extractor was not initialized.")
+    return [_worker_extractor.construct_recording(data=row) for row in rows]
+
+
 class Extractor:
     data_path: str
-    data: DataFrame
     source_part: str
     audio_dir_path: Path
     source: str
+    chunk_size: int
 
-    def __init__(self, data: DataMetaData, source: str):
+    filename_column: Hashable
+    transcript_column: Hashable
+    speaker_column: Hashable | None = None
+    gender_column: Hashable | None = None
+    # row number of the manifest header, None for manifests without one
+    header: int | None = 0
+
+    # filenames already stored for this source part and the number of
+    # manifest rows handled by a previous run, see `resume`
+    existing: set[str]
+    start_row: int
+    rows_done: int
+    rows_read: int
+
+    def __init__(self, data: DataMetaData, source: str, chunk_size: int = 10_000):
         self.data_path = data.data_path
         self.audio_dir_path = Path(data.audio_dir_path)
         self.source = source
         self.source_part = data.source_part
+        self.chunk_size = chunk_size
+        self.existing = set()
+        self.start_row = 0
+        self.rows_done = 0
+        self.rows_read = 0
+
+    def __getstate__(self) -> dict[str, Any]:
+        # workers only construct recordings from the rows they receive
+        state = self.__dict__.copy()
+        state["existing"] = set()
+        return state
+
+    def resume(self, session: Session):
+        """
+        Loads the checkpoint and the already ingested filenames, so that
+        only new manifest rows reach any file I/O.
+        """
+        checkpoint = session.get(ExtractionCheckpoint, (self.source, self.source_part))
+        self.start_row = checkpoint.rows_done if checkpoint else 0  # type: ignore
+        self.rows_done = self.start_row
+        self.existing = set(
+            session.scalars(
+                select(Recording.filename).where(
+                    Recording.source == self.source,
+                    Recording.source_part == self.source_part,
+                )
+            )
+        )
+
+    def save_checkpoint(self, session: Session):
+        session.merge(
+            ExtractionCheckpoint(
+                source=self.source,
+                source_part=self.source_part,
+                rows_done=self.rows_done,
+            )
+        )
+
+    def count_rows(self, block_size: int = 1024**2) -> int:
+        """
+        Counts manifest rows from the newlines, without parsing the file.
+        """
+        lines = 0
+        last = b"\n"
+        with open(self.data_path, "rb") as file:
+            while block := file.read(block_size):
+                lines += block.count(b"\n")
+                last = block[-1:]
+        if last != b"\n":
+            lines += 1
+        return lines - (1 if self.header is not None else 0)
+
+    def read_manifest(self) -> Iterator[DataFrame]:
+        """
+        Streams the manifest in chunks of `chunk_size` rows starting at
+        `start_row`, only one chunk is held in memory at a time.
+        """
+        first_row = 0 if self.header is None else self.header + 1
+        chunks = pd.read_csv(
+            self.data_path,
+            delimiter="\t",
+            header=self.header,
+            skiprows=range(first_row, first_row + self.start_row),
+            chunksize=self.chunk_size,
+        )
+        for chunk in chunks:
+            # keep the index equal to the row number in the whole manifest
+            chunk.index += self.start_row
+            yield chunk
+
+    def pending(self, bar: tqdm | None = None) -> Iterator[DataFrame]:
+        for chunk in self.read_manifest():
+            data = chunk
+            if self.existing:
+                data = chunk[~chunk[self.filename_column].isin(self.existing)]
+            if bar is not None:
+                bar.update(len(chunk) - len(data))
+            if len(chunk):
+                self.rows_read = chunk.index[-1] + 1
+            yield data
+
+    def rows(self, bar: tqdm | None = None) -> Iterator[tuple[int, ManifestRow]]:
+        for data in self.pending(bar):
+            frame = self.prepare(data)
+            yield from zip(
+                frame.index,
+                map(ManifestRow._make, frame.itertuples(index=False, name=None)),
+            )
+
+    def prepare(self, data: DataFrame) -> DataFrame:
+        """
+        Normalises the manifest column by column, so that the per-row work
+        is reduced to reading the fields of a `ManifestRow`.
+        """
+        data = data.astype(object).where(data.notna(), None)
+
+        own_columns = {
+            self.filename_column,
+            self.transcript_column,
+            self.speaker_column,
+            self.gender_column,
+        }
+        other_columns = [
+            col for col in self.other_columns(data) if col not in own_columns
+        ]
+
+        def column(name: Hashable | None) -> Series | None:
+            return data[name] if name is not None else None
+
+        return DataFrame(
+            {
+                "filename": data[self.filename_column],
+                "path": self.get_audio_paths(data[self.filename_column]),
+                "transcript": data[self.transcript_column],
+                "speaker_id": column(self.speaker_column),
+                "speaker_gender": column(self.gender_column),
+                "other_data": (
+                    data[other_columns].to_dict(orient="records")
+                    if other_columns
+                    else [{} for _ in range(len(data))]
+                ),
+            },
+            index=data.index,
+            columns=ManifestRow._fields,
+        )
+
+    def other_columns(self, data: DataFrame) -> list[Hashable]:
+        return list(data.columns)
+
+    def progress(self) -> tqdm:
+        return tqdm(total=max(self.count_rows() - self.start_row, 0))
 
     def extract(self):
-        for _, data in tqdm(self.data.iterrows(), total=len(self.data)):
-            yield self.construct_recording(data=data)
+        bar = self.progress()
+        for index, row in self.rows(bar):
+            recording = self.construct_recording(data=row)
+            self.rows_done = index + 1
+            bar.update(1)
+            yield recording
+        bar.close()
+        self.rows_done = max(self.rows_read, self.rows_done)
 
-    def construct_recording(self, data: Series) -> Recording:
+    def extract_parallel(
+        self,
+        workers: int | None = None,
+        chunk_size: int = 32,
+        max_in_flight: int | None = None,
+    ) -> Generator[Recording, None, None]:
+        """
+        Shards the manifest rows across a process pool and yields the
+        constructed recordings in the manifest order.
+
+        At most `max_in_flight` chunks are submitted at once, so the audio
+        held in memory stays bounded when the consumer is slower than the pool.
+        """
+        workers = workers or os.cpu_count() or 1
+        max_in_flight = max_in_flight or 2 * workers
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self,)
+        ) as pool:
+            in_flight: deque[tuple[list[int], Future[list[Recording]]]] = deque()
+            bar = self.progress()
+            rows = self.rows(bar)
+
+            while chunk := list(islice(rows, chunk_size)):
+                if len(in_flight) >= max_in_flight:
+                    yield from self._collect(*in_flight.popleft(), bar)
+                indices = [index for index, _ in chunk]
+                future = pool.submit(_construct_chunk, [row for _, row in chunk])
+                in_flight.append((indices, future))
+
+            while in_flight:
+                yield from self._collect(*in_flight.popleft(), bar)
+            bar.close()
+        self.rows_done = max(self.rows_read, self.rows_done)
+
+    def _collect(self, indices: list[int], future: Future[list[Recording]], bar: tqdm):
+        recordings = future.result()
+        bar.update(len(recordings))
+        for index, recording in zip(indices, recordings):
+            self.rows_done = index + 1
+            yield recording
+
+    def construct_recording(self, data: ManifestRow) -> Recording:
         return Recording()
 
-    def get_path_to_audio(self, filename: str) -> Path:
-        path = self.audio_dir_path / filename
+    def get_audio_paths(self, filenames: Series) -> Series:
+        return f"{self.audio_dir_path}/" + filenames.astype(str)
+
+    @staticmethod
+    def check_path(path: str) -> Path:
+        _path = Path(path)
 
-        if not path.exists() or not path.is_file():
-            raise FileNotFoundError(f"{path} does not exist.")
-        return path
+        if not _path.exists() or not _path.is_file():
+            raise FileNotFoundError(f"{_path} does not exist.")
+        return _path
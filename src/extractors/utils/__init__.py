@@ -1 +1,7 @@
 from .audio_analyzer import AudioAnalyzer
+from .audio_decoder import (
+    AudioDecoder,
+    FFmpegDecoder,
+    SoundFileDecoder,
+    get_decoder,
+)
@@ -1,4 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Iterable
 
 from pydantic import BaseModel
 from soundfile import SoundFile
@@ -10,15 +13,32 @@ class AnalyzeAudio(BaseModel):
 
 
 class AudioAnalyzer:
-    file: bytes
+    file: bytes | str | Path | BinaryIO
 
-    def __init__(self, file: bytes) -> None:
+    def __init__(self, file: bytes | str | Path | BinaryIO) -> None:
         self.file = file
 
     def analyze(self) -> AnalyzeAudio:
-        with SoundFile(BytesIO(self.file)) as audio_file:
+        """
+        Reads only the container header, paths and file handles are
+        never loaded into memory.
+        """
+        source = BytesIO(self.file) if isinstance(self.file, bytes) else self.file
+
+        with SoundFile(source) as audio_file:
             analyzed = AnalyzeAudio(
-                duration=(len(audio_file) / audio_file.samplerate) * 1000,
+                duration=(audio_file.frames / audio_file.samplerate) * 1000,
                 sampling_rate=audio_file.samplerate,
             )
         return analyzed
+
+    @staticmethod
+    def analyze_many(
+        paths: Iterable[str | Path], max_workers: int = 32
+    ) -> list[AnalyzeAudio]:
+        """
+        Probes the headers of many files concurrently, results keep the order
+        of `paths`. libsndfile releases the GIL, so threads overlap the I/O.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(lambda path: AudioAnalyzer(path).analyze(), paths))
@@ -0,0 +1,70 @@
+import subprocess
+from abc import ABC, abstractmethod
+from io import BytesIO
+
+import soundfile as sf
+
+
+class AudioDecoder(ABC):
+    """
+    Turns compressed audio (MP3) into 16-bit PCM WAV bytes.
+    """
+
+    @abstractmethod
+    def to_wav(self, data: bytes) -> bytes: ...
+
+
+class FFmpegDecoder(AudioDecoder):
+    """
+    Spawns a new ffmpeg process for every clip.
+    """
+
+    def to_wav(self, data: bytes) -> bytes:
+        process = subprocess.run(
+            ["ffmpeg", "-i", "pipe:0", "-f", "wav", "pipe:1"],
+            input=data,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        return process.stdout
+
+
+class SoundFileDecoder(AudioDecoder):
+    """
+    Decodes in-process through libsndfile (MP3 support since libsndfile 1.1.0),
+    keeping the sampling rate and channel count of the source like ffmpeg does.
+    """
+
+    block_size: int
+
+    def __init__(self, block_size: int = 65536) -> None:
+        self.block_size = block_size
+
+    def to_wav(self, data: bytes) -> bytes:
+        output = BytesIO()
+        with sf.SoundFile(BytesIO(data)) as source:
+            with sf.SoundFile(
+                output,
+                mode="w",
+                samplerate=source.samplerate,
+                channels=source.channels,
+                format="WAV",
+                subtype="PCM_16",
+            ) as target:
+                for block in source.blocks(blocksize=self.block_size, dtype="int16"):
+                    target.write(block)
+        return output.getvalue()
+
+
+DECODERS: dict[str, type[AudioDecoder]] = {
+    "ffmpeg": FFmpegDecoder,
+    "soundfile": SoundFileDecoder,
+}
+
+
+def get_decoder(decoder: str | AudioDecoder) -> AudioDecoder:
+    if isinstance(decoder, AudioDecoder):
+        return decoder
+    if decoder not in DECODERS:
+        raise ValueError(f"Unknown decoder {decoder}. Available: {', '.join(DECODERS)}")
+    return DECODERS[decoder]()
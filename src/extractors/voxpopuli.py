@@ -1,7 +1,6 @@
 import os
 from pathlib import Path
 
-import numpy as np
 import pandas as pd
 from pandas import DataFrame, Series
 
@@ -9,59 +8,59 @@ from src.database import Recording
 from src.extractors.utils import AudioAnalyzer
 
 from ..schemas import DataMetaData
-from .parent import Extractor
+from .parent import Extractor, ManifestRow
 
 
 class VoxPopuli(Extractor):
-    data: DataFrame
     source_part: str
     audio_dir_path: Path
     source: str
 
+    filename_column = "id"
+    transcript_column = "raw_text"
+    speaker_column = "speaker_id"
+    gender_column = "gender"
+
     def __init__(
         self, data: DataMetaData, source: str = "voxpopuli", *args, **kwargs
     ) -> None:
         super().__init__(data, source, *args, **kwargs)
-        self.data = pd.read_csv(data.data_path, delimiter="\t")
 
-    def construct_recording(self, data: Series) -> Recording:
-        data = data.replace(np.nan, None)
-        filename = data["id"]
-        _path = self.get_path_to_audio(filename=filename)
-        transcript = data["raw_text"]
+    def prepare(self, data: DataFrame) -> DataFrame:
+        prepared = super().prepare(data)
+        # speaker ids are numeric, NaN turns the whole column into floats
+        speaker_ids = pd.to_numeric(data["speaker_id"]).astype("Int64")
+        prepared["speaker_id"] = speaker_ids.astype(object).where(
+            speaker_ids.notna() & (speaker_ids != 0), None
+        )
+        return prepared
+
+    def construct_recording(self, data: ManifestRow) -> Recording:
+        _path = self.check_path(data.path)
         audio = open(_path, "rb").read()
         audio_size = os.path.getsize(_path) / 1024**2
-        speaker_id = int(data["speaker_id"]) if data["speaker_id"] else None
-        gender = data["gender"]
 
-        _analyzed = AudioAnalyzer(audio).analyze()
+        _analyzed = AudioAnalyzer(_path).analyze()
         duration_ms = _analyzed.duration
         sampling_rate = _analyzed.sampling_rate
 
-        _other_cols = [
-            col
-            for col in self.data.columns
-            if col not in {"id", "raw_text", "speaker_id", "gender"}
-        ]
-
-        other_data = {col_name: data[col_name] for col_name in _other_cols}
-
         return Recording(
-            filename=filename,
-            transcript=transcript,
+            filename=data.filename,
+            transcript=data.transcript,
             audio=audio,
             source=self.source,
             source_part=self.source_part,
             duration_ms=duration_ms,
             audio_size=audio_size,
-            speaker_id=speaker_id,
-            speaker_gender=gender,
+            speaker_id=data.speaker_id,
+            speaker_gender=data.speaker_gender,
             sampling_rate=sampling_rate,
-            other_data=other_data,
+            other_data=data.other_data,
         )
 
-    def get_path_to_audio(self, filename: str) -> Path:
-        if ".wav" not in filename:
-            filename += ".wav"
-
-        return super().get_path_to_audio(filename)
+    def get_audio_paths(self, filenames: Series) -> Series:
+        filenames = filenames.astype(str)
+        filenames = filenames.where(
+            filenames.str.contains(".wav", regex=False), filenames + ".wav"
+        )
+        return super().get_audio_paths(filenames)
@@ -1,4 +1,6 @@
+from .docx_converter import DocxConverter, ParityReport, convert_docx, parity
 from .force_aligner import ForceAligner
+from .member_index import MemberIndex, get_member_index, set_member_index
 from .transcript_parser import TranscriptParser
 from .vad import VadProcessor
 from .wer import WerProcessor
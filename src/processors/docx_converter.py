@@ -0,0 +1,255 @@
+import difflib
+import posixpath
+import re
+import zipfile
+from html import escape
+from io import BytesIO
+from xml.etree import ElementTree
+
+from bs4 import BeautifulSoup
+from pydantic import BaseModel
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+HEADER_TYPE = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/header"
+)
+FOOTER_TYPE = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/footer"
+)
+
+# run formatting in the order the tags are nested, outermost first
+FORMATTING = ("b", "i", "u")
+OFF = {"0", "false", "off", "none"}
+
+
+class ParityReport(BaseModel):
+    same_structure: bool
+    text_ratio: float
+    bold_ratio: float
+
+
+class DocxConverter:
+    """
+    Converts DOCX bytes into the XHTML that Apache Tika produces for them,
+    reading the WordprocessingML parts straight from the zip.
+
+    Follows Tika's mapping: paragraphs with a non default style get the
+    style name as `class`, heading styles become h1 - h6, consecutive
+    formatted runs share one <b> / <i> / <u>, tables are kept and headers
+    and footers are wrapped in <div class="header|footer">. List numbering
+    labels, footnotes and comments are not rendered.
+    """
+
+    content: bytes
+    styles: dict[str, str]
+
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+        self.styles = {}
+
+    def convert(self) -> str:
+        with zipfile.ZipFile(BytesIO(self.content)) as docx:
+            names = set(docx.namelist())
+            if "word/styles.xml" in names:
+                self.styles = self.read_styles(docx.read("word/styles.xml"))
+
+            headers, footers = [], []
+            if "word/_rels/document.xml.rels" in names:
+                headers, footers = self.read_header_footer_parts(
+                    docx.read("word/_rels/document.xml.rels")
+                )
+
+            out: list[str] = [
+                '<html xmlns="http://www.w3.org/1999/xhtml">',
+                "<head><title></title></head><body>",
+            ]
+            for part in headers:
+                if part in names:
+                    out.append('<div class="header">')
+                    self.block_content(ElementTree.fromstring(docx.read(part)), out)
+                    out.append("</div>")
+
+            body = ElementTree.fromstring(docx.read("word/document.xml")).find(
+                f"{W}body"
+            )
+            if body is not None:
+                self.block_content(body, out)
+
+            for part in footers:
+                if part in names:
+                    out.append('<div class="footer">')
+                    self.block_content(ElementTree.fromstring(docx.read(part)), out)
+                    out.append("</div>")
+
+        out.append("</body></html>")
+        return "".join(out)
+
+    @staticmethod
+    def read_styles(xml: bytes) -> dict[str, str]:
+        styles = {}
+        for style in ElementTree.fromstring(xml).iter(f"{W}style"):
+            name = style.find(f"{W}name")
+            if style.get(f"{W}type") == "paragraph" and name is not None:
+                styles[style.get(f"{W}styleId", "")] = name.get(f"{W}val", "")
+        return styles
+
+    @staticmethod
+    def read_header_footer_parts(xml: bytes) -> tuple[list[str], list[str]]:
+        headers, footers = [], []
+        for rel in ElementTree.fromstring(xml).iter(f"{REL}Relationship"):
+            target = posixpath.normpath(posixpath.join("word", rel.get("Target", "")))
+            if rel.get("Type") == HEADER_TYPE:
+                headers.append(target)
+            elif rel.get("Type") == FOOTER_TYPE:
+                footers.append(target)
+        return sorted(headers), sorted(footers)
+
+    def block_content(self, element: ElementTree.Element, out: list[str]):
+        for child in element:
+            if child.tag == f"{W}p":
+                self.paragraph(child, out)
+            elif child.tag == f"{W}tbl":
+                self.table(child, out)
+            elif child.tag == f"{W}sdt":
+                content = child.find(f"{W}sdtContent")
+                if content is not None:
+                    self.block_content(content, out)
+            elif child.tag == f"{W}customXml":
+                self.block_content(child, out)
+
+    def table(self, table: ElementTree.Element, out: list[str]):
+        out.append("<table><tbody>")
+        for row in table.findall(f"{W}tr"):
+            out.append("<tr>")
+            for cell in row.findall(f"{W}tc"):
+                out.append("<td>")
+                self.block_content(cell, out)
+                out.append("</td>")
+            out.append("</tr>")
+        out.append("</tbody></table>")
+
+    def paragraph_tag(self, paragraph: ElementTree.Element) -> tuple[str, str | None]:
+        style = paragraph.find(f"{W}pPr/{W}pStyle")
+        name = self.styles.get(style.get(f"{W}val", "")) if style is not None else None
+
+        if not name or name in ("Normal", "Default"):
+            return "p", None
+        if name.lower().startswith("heading"):
+            level = name[-1]
+            return f"h{min(int(level), 6) if level.isdigit() else 1}", None
+        if name == "Title":
+            return "h1", "title"
+        if name == "Subtitle":
+            return "h2", "subtitle"
+        if name == "HTML Preformatted":
+            return "pre", None
+
+        style_class = name.replace(" ", "_")
+        return "p", style_class[:1].lower() + style_class[1:]
+
+    def paragraph(self, paragraph: ElementTree.Element, out: list[str]):
+        tag, style_class = self.paragraph_tag(paragraph)
+        out.append(
+            f'<{tag} class="{escape(style_class)}">' if style_class else f"<{tag}>"
+        )
+
+        open_tags: list[str] = []
+        for run in self.runs(paragraph):
+            text = self.run_text(run)
+            if not text:
+                continue
+            formatting = self.run_formatting(run)
+
+            # close down to the first tag that changes, then open the new ones
+            keep = 0
+            while (
+                keep < len(open_tags)
+                and keep < len(formatting)
+                and open_tags[keep] == formatting[keep]
+            ):
+                keep += 1
+            for open_tag in reversed(open_tags[keep:]):
+                out.append(f"</{open_tag}>")
+            for new_tag in formatting[keep:]:
+                out.append(f"<{new_tag}>")
+            open_tags = formatting
+
+            out.append(escape(text, quote=False))
+
+        for open_tag in reversed(open_tags):
+            out.append(f"</{open_tag}>")
+        out.append(f"</{tag}>")
+
+    def runs(self, element: ElementTree.Element):
+        for child in element:
+            if child.tag == f"{W}r":
+                yield child
+            elif child.tag in (
+                f"{W}hyperlink",
+                f"{W}ins",
+                f"{W}smartTag",
+                f"{W}fldSimple",
+                f"{W}sdt",
+                f"{W}sdtContent",
+                f"{W}customXml",
+            ):
+                yield from self.runs(child)
+
+    @staticmethod
+    def run_formatting(run: ElementTree.Element) -> list[str]:
+        props = run.find(f"{W}rPr")
+        if props is None:
+            return []
+        formatting = []
+        for tag in FORMATTING:
+            found = props.find(f"{W}{tag}")
+            if found is not None and found.get(f"{W}val", "true").lower() not in OFF:
+                formatting.append(tag)
+        return formatting
+
+    @staticmethod
+    def run_text(run: ElementTree.Element) -> str:
+        parts = []
+        for child in run:
+            if child.tag == f"{W}t":
+                parts.append(child.text or "")
+            elif child.tag == f"{W}tab":
+                parts.append("\t")
+            elif child.tag in (f"{W}br", f"{W}cr"):
+                parts.append("\n")
+            elif child.tag == f"{W}noBreakHyphen":
+                parts.append("-")
+        return "".join(parts)
+
+
+def convert_docx(content: bytes) -> str:
+    return DocxConverter(content).convert()
+
+
+def parity(converted: str, reference: str) -> ParityReport:
+    """
+    Compares what `TranscriptParser` reads from two XHTML documents: the
+    text of the unstyled paragraphs and their bold parts.
+    """
+
+    def structure(xhtml: str) -> tuple[list[str], list[str]]:
+        soup = BeautifulSoup(xhtml, "html.parser")
+        texts, bolds = [], []
+        for p in soup.find_all("p", class_=False):
+            text = re.sub(r"\s+", " ", p.get_text(" ", strip=True))
+            if text:
+                texts.append(text)
+            b_tag = p.find("b")
+            if b_tag:
+                bolds.append(b_tag.get_text(strip=True))
+        return texts, bolds
+
+    texts, bolds = structure(converted)
+    reference_texts, reference_bolds = structure(reference)
+    return ParityReport(
+        same_structure=texts == reference_texts and bolds == reference_bolds,
+        text_ratio=difflib.SequenceMatcher(None, texts, reference_texts).ratio(),
+        bold_ratio=difflib.SequenceMatcher(None, bolds, reference_bolds).ratio(),
+    )
@@ -14,6 +14,8 @@ from rapidfuzz.distance import Levenshtein
 from tqdm import tqdm
 from whisperx import load_audio
 
+from src.storage import AudioCache
+
 logger = structlog.get_logger()
 
 
@@ -49,20 +51,25 @@ class VADSegment(BaseModel):
 
 class ForceAligner:
     metadata: Any
+    cache: AudioCache | None
 
     gt_adapter: TypeAdapter[list[GTSegment]]
     wt_adapter: TypeAdapter[list[WordSegment]]
     vad_adapter: TypeAdapter[list[VADSegment]]
     only_dots_and_spaces: Pattern = re.compile(r"[. ]*")
 
-    def __init__(self) -> None:
+    def __init__(self, cache: AudioCache | None = None) -> None:
+        self.cache = cache
         self.gt_adapter = TypeAdapter(list[GTSegment])
         self.wt_adapter = TypeAdapter(list[WordSegment])
         self.vad_adapter = TypeAdapter(list[VADSegment])
 
     def load_audio(self, file_path: str):
         logger.debug("Loading audio", file_path=file_path)
-        audio = load_audio(file_path)
+        if self.cache is not None:
+            audio = self.cache.load_float(file_path)
+        else:
+            audio = load_audio(file_path)
         logger.debug("Audio loaded", file_path=file_path)
         return audio
 
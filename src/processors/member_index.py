@@ -0,0 +1,84 @@
+from typing import Iterable
+
+import structlog
+from redis import Redis
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.database import Members
+from src.redis_client import redis_factory
+
+logger = structlog.get_logger()
+
+# the index of the current process, set once per worker
+_index: "MemberIndex | None" = None
+
+
+class MemberIndex:
+    """
+    In memory set of the name parts of all members, the same words
+    `NRSRMembers.save` adds to the `members` Redis set.
+
+    `version` is the row count and the highest id of the members table,
+    so a runner can tell when the index has to be rebuilt.
+    """
+
+    names: frozenset[str]
+    version: str
+
+    def __init__(self, names: Iterable[str], version: str = "") -> None:
+        self.names = frozenset(names)
+        self.version = version
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.names
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def count(self, words: Iterable[str]) -> int:
+        return sum(word in self.names for word in words)
+
+    @staticmethod
+    def current_version(session: Session) -> str:
+        count, max_id = session.execute(
+            select(func.count(Members.id), func.max(Members.id))
+        ).one()
+        return f"{count}:{max_id or 0}"
+
+    @classmethod
+    def from_session(cls, session: Session) -> "MemberIndex":
+        version = cls.current_version(session)
+        names: set[str] = set()
+        for name, surname in session.execute(select(Members.name, Members.surname)):
+            names.update(str(i).strip() for i in (name or "").split())
+            names.update(str(i).strip() for i in (surname or "").split())
+
+        logger.info("Member index loaded", names=len(names), version=version)
+        return cls(names, version)
+
+    @classmethod
+    def from_redis(cls, client: Redis) -> "MemberIndex":
+        names = client.smembers("members")
+        return cls(
+            i.decode() if isinstance(i, bytes) else str(i) for i in names  # type: ignore
+        )
+
+
+def set_member_index(index: MemberIndex):
+    """
+    Installs the index for this process, used as the pool initializer.
+    """
+    global _index
+    _index = index
+
+
+def get_member_index() -> MemberIndex:
+    """
+    Returns the index of this process. Without one installed, it is read
+    from Redis once and kept.
+    """
+    global _index
+    if _index is None:
+        _index = MemberIndex.from_redis(redis_factory())
+    return _index
@@ -4,9 +4,8 @@ from re import Pattern
 import structlog
 from bs4 import BeautifulSoup
 from pydantic import BaseModel
-from redis import Redis
 
-from src.redis_client import redis_factory
+from .member_index import MemberIndex, get_member_index
 
 logger = structlog.get_logger()
 
@@ -18,12 +17,12 @@ class TranscriptSegment(BaseModel):
 
 class TranscriptParser:
     content: str
-    redis_client: Redis | None
+    members: MemberIndex | None
     soup: BeautifulSoup
     parenthesis_re: Pattern
     unclosed_re: Pattern
 
-    def __init__(self, xhtml: str) -> None:
+    def __init__(self, xhtml: str, members: MemberIndex | None = None) -> None:
         self.content = xhtml
         self.soup = BeautifulSoup(self.content, "html.parser")
 
@@ -32,7 +31,7 @@ class TranscriptParser:
 
         self.unclosed_re = re.compile(r"\s*\([^)]*\.")
         self.unclosed2_re = re.compile(r"\s*\[[^)]*\.")
-        self.client = None
+        self.members = members
 
     @staticmethod
     def clean_and_split(text):
@@ -49,7 +48,7 @@ class TranscriptParser:
         if not words:
             return
 
-        number_of_members = sum(self.client.smismember("members", words))  # type: ignore
+        number_of_members = self.members.count(words)  # type: ignore
 
         # a line can have any number of names from 1 to 3
         # Andrej, Danko - 1
@@ -83,10 +82,9 @@ class TranscriptParser:
         return False
 
     def parse(self) -> list[dict]:
-        # initialize the redis client
-        # for parallel processing to work
-        if self.client is None:
-            self.client = redis_factory()
+        # without an index given, use the one of this process
+        if self.members is None:
+            self.members = get_member_index()
         result = []
         current_speaker = None
         current_text = []
@@ -5,6 +5,8 @@ import structlog
 from pydantic import BaseModel, Field
 from typing import Any
 
+from src.storage import AudioCache
+
 
 logger = structlog.get_logger()
 warnings.filterwarnings(
@@ -28,16 +30,19 @@ class VadProcessor:
     device: str = "cuda"
     chunk_size: int = 30
     vad_model: Any
+    cache: AudioCache | None
     default_vad_options = {
         "chunk_size": 30,
         "vad_onset": 0.500,
         "vad_offset": 0.363,
     }
 
-    def __init__(self) -> None:
+    def __init__(self, cache: AudioCache | None = None) -> None:
         import torch
         from whisperX.whisperx.vads import Pyannote
 
+        self.cache = cache
+
         self.vad_model = Pyannote(
             torch.device(self.device), use_auth_token=None, **self.default_vad_options
         )
@@ -46,7 +51,10 @@ class VadProcessor:
         from whisperX.whisperx import load_audio
 
         logger.debug("Loading audio", file_path=file_path)
-        audio = load_audio(file_path)
+        if self.cache is not None:
+            audio = self.cache.load_float(file_path)
+        else:
+            audio = load_audio(file_path)
         logger.debug("Audio loaded", file_path=file_path)
         return audio
 
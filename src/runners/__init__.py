@@ -1,7 +1,10 @@
 from .aligner_runner import AlignerRunner
+from .blob_migration_runner import BlobMigrationRunner
+from .export_runner import ExportRunner
 from .parser_runner import ParserRunner
-from .scraper_runner import ScraperRunner
+from .scraper_runner import PipelineStage, ScraperRunner
 from .tika_runner import TikaRunner
+from .transcode_runner import TranscodeRunner
 from .utils import init_db
 from .vad_runner import VadRunner
 from .wer_runner import WerRunner
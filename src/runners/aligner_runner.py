@@ -5,6 +5,7 @@ from sqlalchemy import String, cast, desc, func, literal, select
 from sqlalchemy.orm import Session, aliased
 
 from src.database import NRSRRecording, NRSRTranscript
+from src.storage import AudioCache
 
 from ..processors import ForceAligner
 
@@ -16,9 +17,9 @@ FILENAME = "/mnt/bigben/nrsr_recordings"
 class AlignerRunner:
     aligner: ForceAligner
 
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: Session, cache: AudioCache | None = None) -> None:
         self.session = session
-        self.aligner = ForceAligner()
+        self.aligner = ForceAligner(cache=cache)
 
     def fetch_db(self) -> Generator[Any, None, None]:
         nr = aliased(NRSRRecording)
@@ -30,7 +31,8 @@ class AlignerRunner:
             + func.to_char(
                 tran.snapshot, "DD-MM-YYYY"
             )  # ← single quotes for the format mask
-            + literal(".mp3")
+            + literal(".")
+            + nr.audio_format
         ).label("filename")
 
         result = self.session.execute(
@@ -0,0 +1,65 @@
+import structlog
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from tqdm import tqdm
+
+from src.database import Recording
+from src.storage import BlobStore
+
+logger = structlog.get_logger()
+
+
+class BlobMigrationRunner:
+    """
+    Moves audio of existing `recording` rows from the LargeBinary column
+    into the blob store, one keyset-paginated batch at a time.
+    """
+
+    session: Session
+    store: BlobStore
+
+    def __init__(self, session: Session, store: BlobStore) -> None:
+        self.session = session
+        self.store = store
+
+    def count(self) -> int:
+        return self.session.scalar(
+            select(func.count()).where(Recording.audio.isnot(None))
+        )  # type: ignore
+
+    def fetch_batch(self, last_id: int, n: int):
+        return self.session.execute(
+            select(Recording.id, Recording.audio)
+            .where(Recording.audio.isnot(None), Recording.id > last_id)
+            .order_by(Recording.id)
+            .limit(n)
+        ).all()
+
+    def run(self, batch_size: int = 200):
+        bar = tqdm(total=self.count())
+        last_id = 0
+        batch = self.fetch_batch(last_id, batch_size)
+
+        while batch:
+            updates = []
+            for recording_id, audio in batch:
+                ref = self.store.put(audio)
+                updates.append(
+                    {
+                        "id": recording_id,
+                        "audio": None,
+                        "audio_hash": ref.hash,
+                        "audio_offset": ref.offset,
+                        "audio_length": ref.length,
+                    }
+                )
+
+            self.session.execute(update(Recording), updates)
+            self.session.commit()
+            bar.update(len(batch))
+
+            last_id = batch[-1].id
+            batch = self.fetch_batch(last_id, batch_size)
+
+        bar.close()
+        logger.info("Audio migrated to the blob store", root=str(self.store.root))
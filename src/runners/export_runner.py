@@ -0,0 +1,320 @@
+import io
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from itertools import islice
+from pathlib import Path
+from typing import Any, Literal
+
+import soundfile as sf
+import structlog
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from tqdm import tqdm
+
+from src.database import NRSRRecording, NRSRTranscript, Recording, engine
+from src.exporters import SHARD_WRITERS
+from src.schemas import FILENAME
+from src.storage import AudioCache, BlobStore
+
+logger = structlog.get_logger()
+
+SAMPLE_RATE = AudioCache.SAMPLE_RATE
+
+
+class ShardPlan(BaseModel):
+    name: str
+    first_id: int
+    last_id: int
+    rows: int
+
+
+class SegmentRange(BaseModel):
+    transcript_id: int
+    start: int
+    stop: int
+
+
+class NRSRShardPlan(BaseModel):
+    name: str
+    parts: list[SegmentRange]
+    rows: int
+
+
+def _init_worker():
+    # connections inherited from the parent must not be shared with it
+    engine.dispose(close=False)
+
+
+def export_recording_shard(
+    plan: ShardPlan, path: Path, shard_format: str, blob_root: str | None = None
+) -> int:
+    store = BlobStore(blob_root) if blob_root else None
+
+    with Session(engine) as session, SHARD_WRITERS[shard_format](path) as writer:
+        # yield_per streams the rows through a server-side cursor
+        result = session.scalars(
+            select(Recording)
+            .where(Recording.id.between(plan.first_id, plan.last_id))
+            .order_by(Recording.id)
+            .execution_options(yield_per=100)
+        )
+        for recording in result:
+            if recording.audio is not None:
+                audio = recording.audio
+            elif store is not None and recording.audio_hash:
+                audio = store.open(
+                    recording.audio_hash,  # type: ignore
+                    recording.audio_offset or 0,  # type: ignore
+                    recording.audio_length,  # type: ignore
+                )
+            else:
+                raise ValueError(f"Recording {recording.id} has no audio available")
+
+            writer.add(
+                f"{recording.id:09d}",
+                audio,
+                "wav",
+                {
+                    "id": recording.id,
+                    "filename": recording.filename,
+                    "transcript": recording.transcript,
+                    "source": recording.source,
+                    "source_part": recording.source_part,
+                    "duration_ms": recording.duration_ms,
+                    "sampling_rate": recording.sampling_rate,
+                    "speaker_id": recording.speaker_id,
+                    "speaker_gender": recording.speaker_gender,
+                    "other_data": recording.other_data,
+                },
+            )
+            session.expunge(recording)
+        return writer.count
+
+
+def export_nrsr_shard(
+    plan: NRSRShardPlan, path: Path, shard_format: str, cache_root: str | None = None
+) -> int:
+    with SHARD_WRITERS[shard_format](path) as writer:
+        # a shard holds consecutive segment ranges of one or more transcripts
+        for part in plan.parts:
+            with Session(engine) as session:
+                transcript = session.get_one(NRSRTranscript, part.transcript_id)
+                segments: list[dict[str, Any]] = transcript.aligned_segments  # type: ignore
+                audio_format = session.scalar(
+                    select(NRSRRecording.audio_format).where(
+                        NRSRRecording.meeting_num == transcript.meeting_num,
+                        NRSRRecording.snapshot == transcript.snapshot,
+                    )
+                )
+                file_path = (
+                    f"{FILENAME}/{transcript.meeting_num}_"
+                    f"{transcript.snapshot.strftime('%d-%m-%Y')}.{audio_format}"
+                )
+                meta = {
+                    "transcript_id": part.transcript_id,
+                    "meeting_name": transcript.meeting_name,
+                    "meeting_num": transcript.meeting_num,
+                    "snapshot": transcript.snapshot.isoformat(),
+                }
+
+            if cache_root:
+                audio = AudioCache(cache_root).load(file_path)
+            else:
+                audio = AudioCache.decode_uncached(file_path)
+
+            for index in range(part.start, part.stop):
+                segment = segments[index]
+                chunk = audio[
+                    int(segment["start"] * SAMPLE_RATE) : int(
+                        segment["end"] * SAMPLE_RATE
+                    )
+                ]
+                buffer = io.BytesIO()
+                sf.write(buffer, chunk, SAMPLE_RATE, format="FLAC", subtype="PCM_16")
+                writer.add(
+                    f"{part.transcript_id:06d}_{index:05d}",
+                    buffer.getvalue(),
+                    "flac",
+                    meta
+                    | {
+                        "text": segment["text"],
+                        "start": segment["start"],
+                        "end": segment["end"],
+                    },
+                )
+        return writer.count
+
+
+class ExportRunner:
+    """
+    Exports `recording` rows and NRSR aligned segments into fixed-size
+    training shards, written by a pool of worker processes. NRSR segments
+    are packed across transcripts, a shard is not tied to one meeting.
+
+    Shards are planned upfront and saved into `index.json`, so a restarted
+    export only writes the shards missing on disk and plans new ones for
+    rows inserted, or transcripts aligned, since.
+    """
+
+    session: Session
+    output_dir: Path
+    shard_format: Literal["tar", "parquet"]
+    shard_size: int
+    workers: int
+    blob_root: str | None
+    cache_root: str | None
+
+    def __init__(
+        self,
+        session: Session,
+        output_dir: str | Path,
+        shard_format: Literal["tar", "parquet"] = "tar",
+        shard_size: int = 2000,
+        workers: int | None = None,
+        blob_root: str | None = None,
+        cache_root: str | None = None,
+    ) -> None:
+        self.session = session
+        self.output_dir = Path(output_dir)
+        self.shard_format = shard_format
+        self.shard_size = shard_size
+        self.workers = workers or os.cpu_count() or 1
+        self.blob_root = blob_root
+        self.cache_root = cache_root
+
+    def shard_path(self, subset: str, name: str) -> Path:
+        return self.output_dir / subset / f"{name}.{self.shard_format}"
+
+    def plan_recordings(self) -> list[ShardPlan]:
+        index_path = self.output_dir / "recording" / "index.json"
+        adapter = TypeAdapter(list[ShardPlan])
+        plans = (
+            adapter.validate_json(index_path.read_bytes())
+            if index_path.exists()
+            else []
+        )
+
+        last_id = plans[-1].last_id if plans else 0
+        ids = iter(
+            self.session.scalars(
+                select(Recording.id)
+                .where(Recording.id > last_id)
+                .order_by(Recording.id)
+                .execution_options(yield_per=10_000)
+            )
+        )
+        while batch := list(islice(ids, self.shard_size)):
+            plans.append(
+                ShardPlan(
+                    name=f"recording-{len(plans):06d}",
+                    first_id=batch[0],
+                    last_id=batch[-1],
+                    rows=len(batch),
+                )
+            )
+
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        index_path.write_bytes(adapter.dump_json(plans, indent=2))
+        return plans
+
+    def plan_nrsr(self) -> list[NRSRShardPlan]:
+        index_path = self.output_dir / "nrsr" / "index.json"
+        adapter = TypeAdapter(list[NRSRShardPlan])
+        plans = (
+            adapter.validate_json(index_path.read_bytes())
+            if index_path.exists()
+            else []
+        )
+        # transcripts are aligned in any order, so the planned ones are
+        # skipped by id instead of continuing from the last one
+        planned = {part.transcript_id for plan in plans for part in plan.parts}
+
+        tran = NRSRTranscript
+        nr = NRSRRecording
+        counts = self.session.execute(
+            select(tran.id, func.jsonb_array_length(tran.aligned_segments))
+            .join(
+                nr,
+                (tran.meeting_num == nr.meeting_num) & (tran.snapshot == nr.snapshot),
+            )
+            .where(tran.aligned_segments.isnot(None))
+            .order_by(tran.id)
+        )
+
+        parts: list[SegmentRange] = []
+        rows = 0
+        for transcript_id, count in counts:
+            if transcript_id in planned:
+                continue
+            start = 0
+            while start < count:
+                stop = min(count, start + self.shard_size - rows)
+                parts.append(
+                    SegmentRange(transcript_id=transcript_id, start=start, stop=stop)
+                )
+                rows += stop - start
+                start = stop
+                if rows == self.shard_size:
+                    plans.append(
+                        NRSRShardPlan(
+                            name=f"nrsr-{len(plans):06d}", parts=parts, rows=rows
+                        )
+                    )
+                    parts, rows = [], 0
+        if parts:
+            plans.append(
+                NRSRShardPlan(name=f"nrsr-{len(plans):06d}", parts=parts, rows=rows)
+            )
+
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        index_path.write_bytes(adapter.dump_json(plans, indent=2))
+        return plans
+
+    def run(self, recordings: bool = True, nrsr: bool = True):
+        (self.output_dir / "recording").mkdir(parents=True, exist_ok=True)
+        (self.output_dir / "nrsr").mkdir(parents=True, exist_ok=True)
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker
+        ) as pool:
+            futures: dict[Future[int], Path] = {}
+            if recordings:
+                for plan in self.plan_recordings():
+                    path = self.shard_path("recording", plan.name)
+                    if not path.exists():
+                        future = pool.submit(
+                            export_recording_shard,
+                            plan,
+                            path,
+                            self.shard_format,
+                            self.blob_root,
+                        )
+                        futures[future] = path
+            if nrsr:
+                for nrsr_plan in self.plan_nrsr():
+                    path = self.shard_path("nrsr", nrsr_plan.name)
+                    if not path.exists():
+                        future = pool.submit(
+                            export_nrsr_shard,
+                            nrsr_plan,
+                            path,
+                            self.shard_format,
+                            self.cache_root,
+                        )
+                        futures[future] = path
+
+            logger.info("Exporting shards", shards=len(futures))
+            samples = 0
+            failed = 0
+            for future in tqdm(as_completed(futures), total=len(futures)):
+                try:
+                    samples += future.result()
+                except Exception as e:
+                    # the shard stays missing and is retried by the next run
+                    failed += 1
+                    logger.error(
+                        "Shard export failed", path=str(futures[future]), error=str(e)
+                    )
+
+        logger.info("Export finished", samples=samples, failed_shards=failed)
@@ -1,51 +1,185 @@
-from concurrent.futures import ProcessPoolExecutor
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from datetime import date
-from typing import Generator
+from functools import partial
+from typing import Any, Callable
 
-from sqlalchemy import and_, select
+import structlog
+from sqlalchemy import and_, select, update
 from sqlalchemy.orm import Session
+from tqdm import tqdm
 
 from src.database import NRSRTranscript
 
-from ..processors import TranscriptParser
+from ..processors import MemberIndex, TranscriptParser, convert_docx, set_member_index
+
+logger = structlog.get_logger()
+
+PENDING = and_(
+    NRSRTranscript.json_parsed == None,  # noqa
+    NRSRTranscript.scraped_file_type == "docx",
+    NRSRTranscript.snapshot > date(2010, 1, 1),
+)
+
+
+def parse_xhtml(chunk: list[tuple[int, str]]) -> list[dict[str, Any]]:
+    return [
+        {"id": transcript_id, "json_parsed": TranscriptParser(xhtml).parse()}
+        for transcript_id, xhtml in chunk
+    ]
+
+
+def parse_docx(
+    chunk: list[tuple[int, bytes]], store_xhtml: bool = False
+) -> list[dict[str, Any]]:
+    values = []
+    for transcript_id, content in chunk:
+        xhtml = convert_docx(content)
+        value = {"id": transcript_id, "json_parsed": TranscriptParser(xhtml).parse()}
+        if store_xhtml:
+            value["xhtml_parsed"] = xhtml
+        values.append(value)
+    return values
 
 
 class ParserRunner:
+    """
+    Parses the transcripts into speaker segments on a process pool.
+
+    The pool lives for the whole run. Workers get chunks of plain
+    `(id, document)` tuples, build the soup themselves and send back only
+    the rows to update, so nothing heavy is pickled. Up to `in_flight`
+    chunks are queued and the results are committed as they complete.
+    """
+
     session: Session
+    members: MemberIndex | None
+    workers: int
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, workers: int | None = None):
         self.session = session
+        self.members = None
+        self.workers = workers or os.cpu_count() or 1
+
+    def refresh_members(self) -> bool:
+        """
+        Reloads the member index when the members table changed since it
+        was built. Returns whether it was reloaded.
+        """
+        version = MemberIndex.current_version(self.session)
+        if self.members is not None and self.members.version == version:
+            return False
+        self.members = MemberIndex.from_session(self.session)
+        return True
 
-    def fetch_db(self, n: int) -> Generator[NRSRTranscript, None, None]:
-        result = self.session.execute(
-            select(NRSRTranscript)
-            .where(
-                and_(
-                    NRSRTranscript.json_parsed == None,  # noqa
-                    NRSRTranscript.scraped_file_type == "docx",
-                    NRSRTranscript.snapshot > date(2010, 1, 1),
+    def start_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=set_member_index,
+            initargs=(self.members,),
+        )
+
+    def fetch_xhtml(self, n: int, last_id: int) -> list[Any]:
+        return list(
+            self.session.execute(
+                select(NRSRTranscript.id, NRSRTranscript.xhtml_parsed)
+                .where(
+                    PENDING,
+                    NRSRTranscript.xhtml_parsed.isnot(None),
+                    NRSRTranscript.id > last_id,
                 )
+                .order_by(NRSRTranscript.id)
+                .limit(n)
             )
-            .limit(n)
         )
 
-        for i in result.scalars():
-            yield i
+    def fetch_docx(self, n: int, last_id: int) -> list[Any]:
+        # neither the stored XHTML nor the other large columns are loaded
+        return list(
+            self.session.execute(
+                select(NRSRTranscript.id, NRSRTranscript.scraped_file)
+                .where(PENDING, NRSRTranscript.id > last_id)
+                .order_by(NRSRTranscript.id)
+                .limit(n)
+            )
+        )
 
-    def run(self, n: int):
-        records = [i for i in self.fetch_db(n)]
+    def run(self, chunk_size: int = 10, in_flight: int | None = None):
+        """
+        Parses the XHTML stored by the Tika stage.
+        """
+        self.stream(self.fetch_xhtml, parse_xhtml, chunk_size, in_flight)
 
-        while records:
-            self.transform_records(records)
+    def run_fused(
+        self,
+        chunk_size: int = 10,
+        store_xhtml: bool = False,
+        in_flight: int | None = None,
+    ):
+        """
+        Goes from `scraped_file` straight to `json_parsed` in one worker
+        pass, without the Tika stage. The XHTML is only written back when
+        `store_xhtml` is set, e.g. for debugging the parser.
+        """
+        task = partial(parse_docx, store_xhtml=store_xhtml)
+        self.stream(self.fetch_docx, task, chunk_size, in_flight)
 
-            self.session.commit()
-            records = [i for i in self.fetch_db(n)]
+    def stream(
+        self,
+        fetch: Callable[[int, int], list[Any]],
+        task: Callable[[list[tuple]], list[dict[str, Any]]],
+        chunk_size: int,
+        in_flight: int | None = None,
+    ):
+        # enough queued chunks that no worker waits for the database
+        in_flight = in_flight or 2 * self.workers
+        self.refresh_members()
+        pool = self.start_pool()
+        pending: dict[Future, list[int]] = {}
+        last_id = 0
+        exhausted = False
+        bar = tqdm(unit="transcript")
 
-    def transform_records(self, records: list[NRSRTranscript]):
-        parsers = [TranscriptParser(str(i.xhtml_parsed)) for i in records]
+        try:
+            while True:
+                while not exhausted and len(pending) < in_flight:
+                    rows = fetch(chunk_size, last_id)
+                    if not rows:
+                        exhausted = True
+                        break
+                    last_id = rows[-1].id
+                    chunk = [tuple(row) for row in rows]
+                    pending[pool.submit(task, chunk)] = [row.id for row in rows]
 
-        with ProcessPoolExecutor() as pool:
-            futures = [pool.submit(i.parse) for i in parsers]
+                if not pending:
+                    break
 
-        for transcript_future, record in zip(futures, records):
-            record.json_parsed = transcript_future.result()  # type: ignore
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                self.write_results(done, pending, bar)
+
+                if self.refresh_members():
+                    # the workers hold the old index, finish what they
+                    # have and start new ones
+                    self.write_results(set(pending), pending, bar)
+                    pool.shutdown()
+                    pool = self.start_pool()
+        finally:
+            pool.shutdown(cancel_futures=True)
+            bar.close()
+
+    def write_results(
+        self, done: set[Future], pending: dict[Future, list[int]], bar: tqdm
+    ):
+        values = []
+        for future in done:
+            ids = pending.pop(future)
+            try:
+                values.extend(future.result())
+            except Exception as e:
+                # the chunk stays pending, the keyset moves past it
+                logger.error("Parsing failed", ids=ids, error=str(e))
+
+        if values:
+            self.session.execute(update(NRSRTranscript), values)
+            self.session.commit()
+            bar.update(len(values))
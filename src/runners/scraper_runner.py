@@ -1,13 +1,13 @@
 import asyncio
 import os
-import random
-from typing import Any, Type
+from typing import Any, Awaitable, Callable, NamedTuple, Type
 
 import structlog
 from aiohttp import ClientSession
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from src.scraping.browser_pool import BrowserPool
 from src.scraping.crawlers import (
     DLTranscript,
     NRSRMembers,
@@ -17,46 +17,151 @@ from src.scraping.crawlers import (
     TranscriptDownloader,
     VideoDownloader,
 )
-from src.scraping.link_queue import LinkQueue, URLRecord
+from src.scraping.http_cache import HTTPCache, NotCachedError
+from src.scraping.link_queue import LinkQueue, RunLock, URLRecord
+from src.scraping.rate_limiter import RateLimiter
 
 logger = structlog.get_logger()
 
 
+class PipelineStage(NamedTuple):
+    name: str
+    source_queue: LinkQueue
+    target_queue: LinkQueue | None
+    workers: int
+    # creates the coroutine of one worker of the stage
+    task: Callable[[], Awaitable[None]]
+
+
 class ScraperRunner:
     session_maker: async_sessionmaker[AsyncSession]
+    rate_limiter: RateLimiter | None
+    http_cache: HTTPCache | None
+    browser_pool: BrowserPool | None
 
-    def __init__(self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        rate_limiter: RateLimiter | None = None,
+        http_cache: HTTPCache | None = None,
+        browser_pool: BrowserPool | None = None,
+    ) -> None:
         self.session_maker = session_maker
+        # shared with the aiohttp session through its trace config,
+        # crawlers driving a browser acquire from it themselves
+        self.rate_limiter = rate_limiter
+        self.http_cache = http_cache
+        self.browser_pool = browser_pool
 
     async def run_tasks(self, tasks: list):
         async with asyncio.TaskGroup() as group:
             for task in tasks:
                 group.create_task(task)
 
+    async def run_pipeline(self, stages: list[PipelineStage]):
+        """
+        Runs all stages at once, every stage consumes its source queue as
+        the upstream stage fills it. A queue is closed once all the stages
+        producing into it are done, which stops its consumers.
+
+        The queues should be created with `pop_timeout=0`, so that an idle
+        worker waits for its upstream instead of giving up.
+
+        Runs are serialized by a `RunLock`. Only with no other run alive is
+        it safe to reclaim the leases and the markers left in the queues.
+        """
+        async with RunLock(stages[0].source_queue.client):
+            await self._run_pipeline(stages)
+
+    async def _run_pipeline(self, stages: list[PipelineStage]):
+        producers: dict[str, int] = {}
+        for stage in stages:
+            if stage.target_queue is not None:
+                producers[stage.target_queue.id] = (
+                    producers.get(stage.target_queue.id, 0) + 1
+                )
+
+        def consumers(queue: LinkQueue) -> int:
+            return sum(s.workers for s in stages if s.source_queue.id == queue.id)
+
+        # reclaims what an interrupted run left leased, so that every item
+        # is queued before the markers are
+        for stage in stages:
+            await stage.source_queue.reopen()
+        for stage in stages:
+            # seeded queues have no producer, their content is all there is
+            if stage.source_queue.id not in producers:
+                await stage.source_queue.close(stage.workers)
+
+        async def run_stage(stage: PipelineStage):
+            await self.run_tasks([stage.task() for _ in range(stage.workers)])
+            await logger.ainfo("Stage finished", stage=stage.name)
+
+            target = stage.target_queue
+            if target is not None:
+                producers[target.id] -= 1
+                if producers[target.id] == 0:
+                    await target.close(consumers(target))
+
+        async with asyncio.TaskGroup() as group:
+            for stage in stages:
+                group.create_task(run_stage(stage))
+
     async def scrape(
         self,
         queue: LinkQueue,
         scraper: Type[Scraper],
         scraping_kwargs: dict[str, Any] = {},
         saving_kwargs: dict[str, Any] = {},
+        batch_size: int = 1,
     ):
+        # items claimed by this worker and not acknowledged yet
+        claimed: list[URLRecord] = []
         try:
-            item_to_scrape: URLRecord = await queue.pop()
-            while item_to_scrape:
-                crawler = scraper(item_to_scrape)
-                async for item in crawler.scrape(**scraping_kwargs):
-                    if item:
-                        await crawler.save(item, **saving_kwargs)
-                    else:
-                        await logger.awarning(f"{item} parsed None")
-
-                await asyncio.sleep(random.uniform(1, 3))
-
-                item_to_scrape: URLRecord = await queue.pop()
+            claimed = await queue.pop_many(batch_size)
+            while claimed:
+                heartbeat = asyncio.create_task(self.keep_lease(queue, claimed))
+                try:
+                    while claimed:
+                        item_to_scrape = claimed[0]
+                        crawler = scraper(item_to_scrape)
+                        try:
+                            async for item in crawler.scrape(**scraping_kwargs):
+                                if item:
+                                    await crawler.save(item, **saving_kwargs)
+                                else:
+                                    await logger.awarning(f"{item} parsed None")
+                        except NotCachedError as e:
+                            # an offline replay skips what the cache can not
+                            # serve, the other items and stages go on
+                            await logger.awarning(
+                                "Skipped in offline mode",
+                                url=str(item_to_scrape.url),
+                                error=str(e),
+                            )
+                            await queue.skip(item_to_scrape)
+                        else:
+                            await queue.ack(item_to_scrape)
+                        claimed.pop(0)
+                finally:
+                    heartbeat.cancel()
+
+                claimed = await queue.pop_many(batch_size)
         except (asyncio.exceptions.CancelledError, Exception) as e:
-            await queue.rollback(item_to_scrape)
+            for item_to_scrape in claimed:
+                await queue.rollback(item_to_scrape)
             raise e
 
+    @staticmethod
+    async def keep_lease(queue: LinkQueue, items: list[URLRecord]):
+        """
+        Extends the leases of the claimed items while they are being scraped,
+        long downloads would otherwise be requeued by another worker.
+        """
+        while True:
+            await asyncio.sleep(queue.lease_seconds / 3)
+            await queue.extend(*items)
+
     async def transcript_task(
         self, source_queue: LinkQueue, http_client: ClientSession
     ):
@@ -64,7 +169,7 @@ class ScraperRunner:
             await self.scrape(
                 source_queue,
                 TranscriptDownloader,
-                scraping_kwargs={"client": http_client},
+                scraping_kwargs={"client": http_client, "cache": self.http_cache},
                 saving_kwargs={"session": session},
             )
 
@@ -72,6 +177,11 @@ class ScraperRunner:
         await self.scrape(
             source_queue,
             DLTranscript,
+            scraping_kwargs={
+                "rate_limiter": self.rate_limiter,
+                "browser_pool": self.browser_pool,
+                "cache": self.http_cache,
+            },
             saving_kwargs={"target_queue": target_queue},
         )
 
@@ -84,7 +194,7 @@ class ScraperRunner:
         await self.scrape(
             source_queue,
             TermsRecording,
-            scraping_kwargs={"client": http_client},
+            scraping_kwargs={"client": http_client, "cache": self.http_cache},
             saving_kwargs={"target_queue": target_queue},
         )
 
@@ -97,7 +207,7 @@ class ScraperRunner:
         await self.scrape(
             source_queue,
             RecordingPages,
-            scraping_kwargs={"client": http_client},
+            scraping_kwargs={"client": http_client, "cache": self.http_cache},
             saving_kwargs={"target_queue": target_queue},
         )
 
@@ -109,7 +219,12 @@ class ScraperRunner:
             await self.scrape(
                 source_queue,
                 VideoDownloader,
-                scraping_kwargs={"client": http_client},
+                scraping_kwargs={
+                    "client": http_client,
+                    "folder": "data/nrsr/recordings",
+                    "cache": self.http_cache,
+                    "rate_limiter": self.rate_limiter,
+                },
                 saving_kwargs={"session": session, "folder": "data/nrsr/recordings"},
             )
 
@@ -120,6 +235,6 @@ class ScraperRunner:
             await self.scrape(
                 source_queue,
                 NRSRMembers,
-                scraping_kwargs={"client": http_client},
+                scraping_kwargs={"client": http_client, "cache": self.http_cache},
                 saving_kwargs={"session": session, "redis": redis},
             )
@@ -1,64 +1,216 @@
 import asyncio
-from typing import AsyncGenerator
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncGenerator
 
+import structlog
 from aiohttp import ClientSession
-from sqlalchemy import and_, select
-
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from tqdm import tqdm
 
 from src.database import NRSRTranscript
 
+from ..processors import ParityReport, convert_docx, parity
+
+logger = structlog.get_logger()
+
+PENDING = and_(
+    NRSRTranscript.xhtml_parsed == None,  # noqa
+    NRSRTranscript.scraped_file_type == "docx",
+)
+
 
 class TikaRunner:
+    """
+    Converts the scraped DOCX transcripts to XHTML with Apache Tika.
+
+    Pending rows are streamed by keyset pagination on the id and `parallel`
+    requests are kept in flight at all times. Results are committed in
+    batches by a background writer. A failed document is logged and
+    skipped, it stays pending for the next run.
+
+    In `native` mode the documents are converted by `DocxConverter` on a
+    process pool instead, no Tika server is needed.
+    """
+
     url: str
-    session: AsyncSession
-    client: ClientSession
+    session_maker: async_sessionmaker[AsyncSession]
+    client: ClientSession | None
+    native: bool
+    workers: int
+    pool: ProcessPoolExecutor | None
+    failures: dict[int, str]
 
     def __init__(
-        self, tika_url: str, session: AsyncSession, client: ClientSession
+        self,
+        tika_url: str,
+        session_maker: async_sessionmaker[AsyncSession],
+        client: ClientSession | None = None,
+        native: bool = False,
+        workers: int | None = None,
     ) -> None:
         self.url = tika_url
-        self.session = session
+        self.session_maker = session_maker
         self.client = client
-        self.offset = 0
-
-    async def fetch_db(self, n: int) -> AsyncGenerator[NRSRTranscript, None]:
-        result = await self.session.execute(
-            select(NRSRTranscript)
-            .where(
-                and_(
-                    NRSRTranscript.xhtml_parsed == None,  # noqa
-                    NRSRTranscript.scraped_file_type == "docx",
+        self.native = native
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        self.failures = {}
+
+    async def count(self) -> int:
+        async with self.session_maker() as session:
+            return await session.scalar(
+                select(func.count()).select_from(NRSRTranscript).where(PENDING)
+            )  # type: ignore
+
+    async def fetch_db(self, batch_size: int) -> AsyncGenerator[Any, None]:
+        last_id = 0
+        async with self.session_maker() as session:
+            while True:
+                result = await session.execute(
+                    select(NRSRTranscript.id, NRSRTranscript.scraped_file)
+                    .where(PENDING, NRSRTranscript.id > last_id)
+                    .order_by(NRSRTranscript.id)
+                    .limit(batch_size)
                 )
-            )
-            .limit(n)
-        )
+                rows = result.all()
+                if not rows:
+                    return
+                for row in rows:
+                    yield row
+                last_id = rows[-1].id
 
-        for i in result.scalars():
-            yield i
+    async def convert(self, scraped_file: bytes) -> str:
+        if self.pool is not None:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.pool, convert_docx, scraped_file
+            )
+        return await self.call_tika(scraped_file)
 
-    async def call_tika(self, transcript: NRSRTranscript):
-        async with self.client.put(self.url, data=transcript.scraped_file) as response:
+    async def call_tika(self, scraped_file: bytes) -> str:
+        if self.client is None:
+            raise ValueError("A client session is needed to call Tika.")
+        async with self.client.put(self.url, data=scraped_file) as response:
             if response.status != 200:
-                raise Exception(f"Tika failed for id {transcript.id}")
-            parsed_text = await response.text()
+                raise Exception(f"Tika responded with {response.status}")
+            return await response.text()
+
+    async def process(
+        self,
+        transcript_id: int,
+        scraped_file: bytes,
+        semaphore: asyncio.Semaphore,
+        results: asyncio.Queue,
+        bar: tqdm,
+    ):
+        try:
+            xhtml = await self.convert(scraped_file)
+            await results.put({"id": transcript_id, "xhtml_parsed": xhtml})
+        except Exception as e:
+            self.failures[transcript_id] = str(e)
+            await logger.aerror("Tika failed", id=transcript_id, error=str(e))
+            bar.update(1)
+        finally:
+            semaphore.release()
 
-        transcript.xhtml_parsed = parsed_text  # type: ignore
+    async def write_results(self, results: asyncio.Queue, bar: tqdm, batch_size: int):
+        """
+        Commits the converted documents in batches until None arrives.
+        """
+        batch: list[dict[str, Any]] = []
+        async with self.session_maker() as session:
+            while True:
+                item = await results.get()
+                if item is not None:
+                    batch.append(item)
 
-    async def run_tasks(self, tasks: list):
-        async with asyncio.TaskGroup() as group:
-            for task in tasks:
-                group.create_task(task)
+                if batch and (item is None or len(batch) >= batch_size):
+                    await session.execute(update(NRSRTranscript), batch)
+                    await session.commit()
+                    bar.update(len(batch))
+                    batch = []
 
-    async def run_tika(self, parallel: int = 20, total: int = 2111):
-        tasks = [self.call_tika(i) async for i in self.fetch_db(parallel)]
-        bar = tqdm(total=total)
-        while tasks:
-            await self.run_tasks(tasks)
-            await self.session.commit()
+                if item is None:
+                    return
 
-            bar.update(len(tasks))
-            tasks = [self.call_tika(i) async for i in self.fetch_db(parallel)]
+    async def run_tika(self, parallel: int = 20, commit_every: int = 50):
+        bar = tqdm(total=await self.count())
+        semaphore = asyncio.Semaphore(parallel)
+        # bounded, so that a slow database pushes back on the workers
+        results: asyncio.Queue = asyncio.Queue(maxsize=2 * commit_every)
+
+        if self.native:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self.write_results(results, bar, commit_every))
+
+                async with asyncio.TaskGroup() as workers:
+                    async for row in self.fetch_db(2 * parallel):
+                        await semaphore.acquire()
+                        workers.create_task(
+                            self.process(
+                                row.id, row.scraped_file, semaphore, results, bar
+                            )
+                        )
+                # every worker is done, flush what is left
+                await results.put(None)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
 
         bar.close()
+        if self.failures:
+            logger.warning(
+                "Some documents failed", failed=len(self.failures), ids=[*self.failures]
+            )
+
+    async def check_parity(self, sample: int = 50) -> list[ParityReport]:
+        """
+        Converts a sample of already processed documents natively and
+        compares the result with their stored Tika output.
+        """
+        async with self.session_maker() as session:
+            result = await session.execute(
+                select(
+                    NRSRTranscript.id,
+                    NRSRTranscript.scraped_file,
+                    NRSRTranscript.xhtml_parsed,
+                )
+                .where(
+                    NRSRTranscript.xhtml_parsed.isnot(None),
+                    NRSRTranscript.scraped_file_type == "docx",
+                )
+                .order_by(func.random())
+                .limit(sample)
+            )
+            rows = result.all()
+
+        loop = asyncio.get_running_loop()
+        reports = []
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            converted = await asyncio.gather(
+                *[
+                    loop.run_in_executor(pool, convert_docx, row.scraped_file)
+                    for row in rows
+                ]
+            )
+        for row, xhtml in zip(rows, converted):
+            report = parity(xhtml, row.xhtml_parsed)
+            if not report.same_structure:
+                logger.warning(
+                    "Native conversion differs from Tika",
+                    id=row.id,
+                    text_ratio=round(report.text_ratio, 3),
+                    bold_ratio=round(report.bold_ratio, 3),
+                )
+            reports.append(report)
+
+        logger.info(
+            "Parity checked",
+            documents=len(reports),
+            same_structure=sum(report.same_structure for report in reports),
+        )
+        return reports
@@ -0,0 +1,134 @@
+import os
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import structlog
+from sqlalchemy import String, cast, func, literal, or_, select
+from sqlalchemy.orm import Session
+from tqdm import tqdm
+
+from src.database import NRSRRecording
+from src.extractors.utils import AudioAnalyzer
+from src.schemas import AUDIO_PROFILES, FILENAME, AudioProfile
+
+logger = structlog.get_logger()
+
+
+def transcode(source: Path, target: Path, profile: AudioProfile) -> dict[str, float]:
+    part_path = target.with_name(f"{target.name}.part")
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-loglevel",
+        "error",
+        "-y",
+        "-i",
+        str(source),
+        *profile.ffmpeg_args(),
+        str(part_path),
+    ]
+    try:
+        subprocess.run(cmd, capture_output=True, check=True)
+        analyzed = AudioAnalyzer(part_path).analyze()
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+    os.replace(part_path, target)
+
+    return {
+        "audio_size": target.stat().st_size / 1024**2,
+        "duration": analyzed.duration,
+        "sampling_rate": analyzed.sampling_rate,
+    }
+
+
+class TranscodeRunner:
+    """
+    Converts the downloaded NRSR recordings into another audio profile,
+    e.g. 16 kHz mono FLAC, and updates their `nrsr_recording` rows.
+
+    The ffmpeg processes run in parallel, the threads only wait for them.
+    Sources are kept unless `remove_source` is set.
+    """
+
+    session: Session
+    folder: Path
+    profile: AudioProfile
+    workers: int
+    remove_source: bool
+
+    def __init__(
+        self,
+        session: Session,
+        profile: str = "flac",
+        folder: str | Path = FILENAME,
+        workers: int | None = None,
+        remove_source: bool = False,
+    ) -> None:
+        self.session = session
+        self.profile = AUDIO_PROFILES[profile]
+        self.folder = Path(folder)
+        self.workers = workers or os.cpu_count() or 1
+        self.remove_source = remove_source
+
+    def fetch_db(self):
+        nr = NRSRRecording
+        return self.session.execute(
+            select(
+                nr.id,
+                nr.audio_format,
+                (
+                    cast(nr.meeting_num, String)
+                    + literal("_")
+                    + func.to_char(nr.snapshot, "DD-MM-YYYY")
+                ).label("stem"),
+            )
+            .where(
+                or_(
+                    nr.audio_format.is_(None),
+                    nr.audio_format != self.profile.extension,
+                )
+            )
+            .order_by(nr.id)
+        ).all()
+
+    def run(self):
+        rows = self.fetch_db()
+        logger.info(
+            "Transcoding recordings",
+            recordings=len(rows),
+            profile=self.profile.extension,
+        )
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures: dict[Future[dict[str, float]], tuple[int, Path]] = {}
+            for recording_id, audio_format, stem in rows:
+                source = self.folder / f"{stem}.{audio_format or 'mp3'}"
+                target = self.folder / f"{stem}.{self.profile.extension}"
+                if not source.exists():
+                    logger.warning("Recording file is missing", path=str(source))
+                    continue
+                future = pool.submit(transcode, source, target, self.profile)
+                futures[future] = (recording_id, source)
+
+            failed = 0
+            for future in tqdm(as_completed(futures), total=len(futures)):
+                recording_id, source = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += 1
+                    logger.error("Transcoding failed", path=str(source), error=str(e))
+                    continue
+
+                recording = self.session.get_one(NRSRRecording, recording_id)
+                recording.audio_format = self.profile.extension  # type: ignore
+                for key, value in result.items():
+                    setattr(recording, key, value)
+                self.session.commit()
+
+                if self.remove_source:
+                    source.unlink()
+
+        logger.info("Transcoding finished", failed=failed)
@@ -11,6 +11,7 @@ from sqlalchemy import String, cast, func, literal, select
 from sqlalchemy.orm import Session, aliased
 
 from src.database import NRSRRecording, NRSRTranscript
+from src.storage import AudioCache
 
 from ..processors import VadProcessor
 from ..schemas import RecordingToProcess
@@ -24,9 +25,9 @@ class VadRunner:
     processor: VadProcessor
     q: queue.Queue
 
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: Session, cache: AudioCache | None = None) -> None:
         self.session = session
-        self.processor = VadProcessor()
+        self.processor = VadProcessor(cache=cache)
         self.q = queue.Queue(maxsize=3)
 
     def fetch_db(self) -> Generator[RecordingToProcess, None, None]:
@@ -40,7 +41,8 @@ class VadRunner:
                     cast(nr.meeting_num, String)
                     + literal("_")
                     + func.to_char(nr.snapshot, "DD-MM-YYYY")
-                    + literal(".mp3")
+                    + literal(".")
+                    + nr.audio_format
                 ).label("filename"),
             )
             .select_from(nr)
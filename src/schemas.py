@@ -23,6 +23,58 @@ class DatabaseSettings(BaseSettings):
         case_sensitive = False
 
 
+class AudioProfile(BaseModel):
+    extension: str
+    codec: str
+    sampling_rate: int
+    channels: int
+    bitrate: str | None = None
+    container: str
+
+    def ffmpeg_args(self) -> list[str]:
+        args = [
+            "-vn",
+            "-acodec",
+            self.codec,
+            "-ar",
+            str(self.sampling_rate),
+            "-ac",
+            str(self.channels),
+        ]
+        if self.bitrate:
+            args += ["-b:a", self.bitrate]
+        return args + ["-f", self.container]
+
+
+# "mp3" keeps the original archive format, the 16 kHz mono profiles are
+# what VAD, alignment and export resample to anyway
+AUDIO_PROFILES = {
+    "mp3": AudioProfile(
+        extension="mp3",
+        codec="libmp3lame",
+        sampling_rate=48000,
+        channels=2,
+        bitrate="192k",
+        container="mp3",
+    ),
+    "flac": AudioProfile(
+        extension="flac",
+        codec="flac",
+        sampling_rate=16000,
+        channels=1,
+        container="flac",
+    ),
+    "opus": AudioProfile(
+        extension="opus",
+        codec="libopus",
+        sampling_rate=16000,
+        channels=1,
+        bitrate="32k",
+        container="ogg",
+    ),
+}
+
+
 class RecordingToProcess(BaseModel):
     id: int
     filename: str
@@ -0,0 +1 @@
+from .browser_pool import BrowserPool
@@ -0,0 +1,113 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import structlog
+from playwright.async_api import (
+    Browser,
+    BrowserContext,
+    Page,
+    Playwright,
+    Route,
+    async_playwright,
+)
+
+logger = structlog.get_logger()
+
+
+class BrowserPool:
+    """
+    One Chromium shared by all the crawlers that need a browser. Pages are
+    handed out from at most `contexts` concurrent browser contexts and
+    reused until they served `max_uses` crawls.
+
+    Requests for `blocked_resources` (images, fonts, ...) are aborted, the
+    crawlers only read the DOM.
+    """
+
+    headless: bool
+    contexts: int
+    max_uses: int
+    blocked_resources: frozenset[str]
+
+    def __init__(
+        self,
+        contexts: int = 5,
+        headless: bool = True,
+        max_uses: int = 50,
+        blocked_resources: tuple[str, ...] = ("image", "font", "media"),
+    ) -> None:
+        self.contexts = contexts
+        self.headless = headless
+        self.max_uses = max_uses
+        self.blocked_resources = frozenset(blocked_resources)
+        self.semaphore = asyncio.Semaphore(contexts)
+        self.idle: list[Page] = []
+        self.uses: dict[Page, int] = {}
+        self.playwright: Playwright | None = None
+        self.browser: Browser | None = None
+
+    async def start(self):
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(headless=self.headless)
+        await logger.ainfo("Browser pool started", contexts=self.contexts)
+
+    async def stop(self):
+        for page in self.idle:
+            await page.context.close()
+        self.idle.clear()
+        self.uses.clear()
+        if self.browser is not None:
+            await self.browser.close()
+        if self.playwright is not None:
+            await self.playwright.stop()
+        self.browser = None
+        self.playwright = None
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        async with self.semaphore:
+            page = self.idle.pop() if self.idle else await self.new_page()
+            try:
+                yield page
+            except BaseException:
+                # the page is in an unknown state, it is not handed out again
+                await self.discard(page)
+                raise
+
+            self.uses[page] += 1
+            if self.uses[page] >= self.max_uses or page.is_closed():
+                await self.discard(page)
+            else:
+                self.idle.append(page)
+
+    async def new_page(self) -> Page:
+        if self.browser is None:
+            raise RuntimeError("Browser pool is not started.")
+
+        context: BrowserContext = await self.browser.new_context()
+        if self.blocked_resources:
+            await context.route("**/*", self.block)
+        page = await context.new_page()
+        self.uses[page] = 0
+        return page
+
+    async def discard(self, page: Page):
+        self.uses.pop(page, None)
+        try:
+            await page.context.close()
+        except Exception as e:
+            await logger.awarning("Browser context could not be closed", error=str(e))
+
+    async def block(self, route: Route):
+        if route.request.resource_type in self.blocked_resources:
+            await route.abort()
+        else:
+            await route.continue_()
@@ -7,8 +7,11 @@ import structlog
 from playwright.async_api import async_playwright
 from pydantic import HttpUrl
 
+from ..browser_pool import BrowserPool
+from ..http_cache import HTTPCache
 from ..link_queue import LinkQueue
 from ..link_queue.schemas import MetaData, URLRecord
+from ..rate_limiter import RateLimiter
 from .parent import Scraper
 
 logger = structlog.get_logger()
@@ -17,12 +20,29 @@ logger = structlog.get_logger()
 class DLTranscript(Scraper):
     url: str
     metadata: MetaData
+    rate_limiter: RateLimiter | None
 
     def __init__(self, data: URLRecord):
         self.url = str(data.url)
         self.metadata = data.metadata
+        self.rate_limiter = None
+
+    async def scrape(
+        self,
+        rate_limiter: RateLimiter | None = None,
+        browser_pool: BrowserPool | None = None,
+        cache: HTTPCache | None = None,
+    ) -> AsyncGenerator[URLRecord, None]:
+        # the browser fetches on its own, it can not be served from the cache
+        if cache is not None:
+            cache.check_online(self.url)
+        self.rate_limiter = rate_limiter
+        if browser_pool is not None:
+            async with browser_pool.page() as page:
+                async for item in self._browse(page):
+                    yield item
+            return
 
-    async def scrape(self) -> AsyncGenerator[URLRecord, None]:
         async with async_playwright() as p:
             async for item in self._crawl(p):
                 yield item
@@ -32,17 +52,18 @@ class DLTranscript(Scraper):
         await logger.ainfo(f"{item} added")
 
     async def _crawl(self, p) -> AsyncGenerator[URLRecord, None]:
-        browser = await p.chromium.launch(headless=False)
+        browser = await p.chromium.launch(headless=True)
         try:
-            async for item in self._browse(browser):
+            async for item in self._browse(await browser.new_page()):
                 yield item
         finally:
             await browser.close()
 
-    async def _browse(self, browser) -> AsyncGenerator[URLRecord, None]:
-        page = await browser.new_page()
+    async def _browse(self, page) -> AsyncGenerator[URLRecord, None]:
+        await self.throttle()
         await page.goto(self.url)
         await page.wait_for_selector("//a[text()='Prepis zo schôdze']")
+        await self.throttle()
         await page.click("//a[text()='Prepis zo schôdze']")
         current_page = 1
         while True:
@@ -61,6 +82,7 @@ class DLTranscript(Scraper):
                 )
 
             current_page += 1
+            await self.throttle()
             try:
                 await page.click(
                     f"//div[@class='pager']//span[text()='{current_page}']",
@@ -71,6 +93,11 @@ class DLTranscript(Scraper):
                 await logger.ainfo("No more pages.", url=self.url)
                 break
 
+    async def throttle(self):
+        # page navigation does not go through aiohttp, so acquire explicitly
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(self.url)
+
     async def get_metadata(self, full_text: str) -> MetaData:
         splitted = full_text.split(",")
 
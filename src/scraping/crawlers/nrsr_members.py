@@ -2,11 +2,12 @@ from typing import AsyncGenerator
 
 import structlog
 from aiohttp import ClientSession
-from bs4 import BeautifulSoup
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database import Members
+from src.scraping.html_parser import parse_html_async
+from src.scraping.http_cache import HTTPCache
 from src.scraping.link_queue.schemas import MetaData, URLRecord
 
 from .parent import Scraper
@@ -23,10 +24,9 @@ class NRSRMembers(Scraper):
         self.metadata = data.metadata
 
     async def scrape(
-        self, client: ClientSession
+        self, client: ClientSession, cache: HTTPCache | None = None
     ) -> AsyncGenerator[Members | None, None]:
-        async with client.get(self.url) as response:
-            content = await response.text()
+        content = await self.fetch_text(self.url, client, cache)
 
         async for item in self.parse(content):
             yield item
@@ -41,8 +41,10 @@ class NRSRMembers(Scraper):
             )  # type: ignore
         await session.commit()
 
-    async def parse(self, content: str) -> AsyncGenerator[Members | None, None]:
-        soup = BeautifulSoup(content, "html.parser")
+    async def parse(
+        self, content: str, parser: str | None = None
+    ) -> AsyncGenerator[Members | None, None]:
+        soup = await parse_html_async(content, parser)
 
         for a in soup.select("div.mps_list_block ul li a"):
             full_name = a.get_text(strip=True)
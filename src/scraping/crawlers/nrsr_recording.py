@@ -1,5 +1,3 @@
-import asyncio
-import random
 import re
 from typing import AsyncGenerator
 from urllib.parse import urljoin
@@ -9,6 +7,8 @@ from aiohttp import ClientSession
 from bs4 import BeautifulSoup
 from pydantic import HttpUrl
 
+from ..html_parser import parse_html_async
+from ..http_cache import HTTPCache
 from ..link_queue import LinkQueue
 from ..link_queue.schemas import MetaData, URLRecord
 from .parent import Scraper
@@ -24,16 +24,19 @@ class TermsRecording(Scraper):
         self.url = str(data.url)
         self.metadata = data.metadata
 
-    async def scrape(self, client: ClientSession) -> AsyncGenerator[URLRecord, None]:
-        content = await self.browse(self.url, client)
+    async def scrape(
+        self, client: ClientSession, cache: HTTPCache | None = None
+    ) -> AsyncGenerator[URLRecord, None]:
+        content = await self.browse(self.url, client, cache)
         while content:
-            async for meeting in self.parse_meetings(content):
+            # one tree per page, shared by both extractions
+            soup = await parse_html_async(content)
+            async for meeting in self.parse_meetings(soup):
                 yield meeting
 
-            next_url = self.get_next_page(content)
-            await asyncio.sleep(random.uniform(1, 3))
+            next_url = self.get_next_page(soup)
             if next_url:
-                content = await self.browse(next_url, client)
+                content = await self.browse(next_url, client, cache)
             else:
                 content = None
 
@@ -41,14 +44,15 @@ class TermsRecording(Scraper):
         await target_queue.add(item)
         await logger.ainfo(f"{item} added")
 
-    async def parse_meetings(self, html: str) -> AsyncGenerator[URLRecord, None]:
+    async def parse_meetings(
+        self, soup: BeautifulSoup
+    ) -> AsyncGenerator[URLRecord, None]:
         def normalize_filename(text: str) -> str:
             text = text.lower()
             text = re.sub(r"\s+", "_", text)
             text = re.sub(r"[^a-z0-9_\-\.]", "", text)
             return text
 
-        soup = BeautifulSoup(html, "html.parser")
         meeting_divs = soup.find_all("div", class_="item row")
 
         for div in meeting_divs:
@@ -77,11 +81,13 @@ class TermsRecording(Scraper):
 
             yield URLRecord(
                 url=HttpUrl(urljoin(self.url, link_href)),
-                metadata=MetaData(name=normalized_filename),
+                metadata=MetaData(
+                    name=normalized_filename,
+                    audio_profile=self.metadata.audio_profile,
+                ),
             )
 
-    def get_next_page(self, html: str) -> str | None:
-        soup = BeautifulSoup(html, "html.parser")
+    def get_next_page(self, soup: BeautifulSoup) -> str | None:
         next_url = soup.find(class_="next")
 
         if not next_url:
@@ -94,8 +100,7 @@ class TermsRecording(Scraper):
 
         return urljoin(self.url, next_url.get("href"))  # type: ignore
 
-    async def browse(self, url: str, client: ClientSession) -> str:
-        async with client.get(url) as response:
-            content = await response.text()
-
-        return content
+    async def browse(
+        self, url: str, client: ClientSession, cache: HTTPCache | None = None
+    ) -> str:
+        return await self.fetch_text(url, client, cache)
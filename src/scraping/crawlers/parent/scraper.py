@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 from typing import Any, AsyncGenerator
 
+from aiohttp import ClientSession
+
+from src.scraping.http_cache import HTTPCache
 from src.scraping.link_queue import URLRecord
 
 
@@ -15,3 +18,27 @@ class Scraper(ABC):
 
     @abstractmethod
     async def save(self, item: Any, **kwargs) -> None: ...
+
+    @staticmethod
+    async def fetch_text(
+        url: str, client: ClientSession, cache: HTTPCache | None = None
+    ) -> str:
+        if cache is not None:
+            return await cache.get_text(url, client)
+
+        async with client.get(url) as response:
+            return await response.text()
+
+    @staticmethod
+    async def fetch_bytes(
+        url: str, client: ClientSession, cache: HTTPCache | None = None
+    ) -> tuple[bytes, str]:
+        """
+        Returns the body and the Content-Type of `url`.
+        """
+        if cache is not None:
+            meta, body = await cache.get(url, client)
+            return body, meta.content_type or ""
+
+        async with client.get(url) as response:
+            return await response.read(), response.headers.get("Content-Type", "")
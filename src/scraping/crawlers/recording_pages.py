@@ -5,9 +5,10 @@ from urllib.parse import urlencode
 
 import structlog
 from aiohttp import ClientSession
-from bs4 import BeautifulSoup
 from pydantic import HttpUrl
 
+from src.scraping.html_parser import parse_html_async
+from src.scraping.http_cache import HTTPCache
 from src.scraping.link_queue import LinkQueue
 from src.scraping.link_queue.schemas import MetaData, URLRecord
 
@@ -25,9 +26,9 @@ class RecordingPages(Scraper):
         self.metadata = data.metadata
 
     async def scrape(
-        self, client: ClientSession
+        self, client: ClientSession, cache: HTTPCache | None = None
     ) -> AsyncGenerator[URLRecord | None, None]:
-        content = await self.browse(self.url, client)
+        content = await self.browse(self.url, client, cache)
 
         async for item in self.parse(content):
             yield item
@@ -36,18 +37,19 @@ class RecordingPages(Scraper):
         await target_queue.add(item)
         await logger.ainfo(f"{item} added")
 
-    async def browse(self, url: str, client: ClientSession) -> str:
-        async with client.get(url) as response:
-            content = await response.text()
-
-        return content
+    async def browse(
+        self, url: str, client: ClientSession, cache: HTTPCache | None = None
+    ) -> str:
+        return await self.fetch_text(url, client, cache)
 
     def get_params(self, meeting_date: str):
         params = {"MeetingDate": meeting_date, "DisplayChairman": "true"}
         return params
 
-    async def parse(self, html: str) -> AsyncGenerator[URLRecord | None, None]:
-        soup = BeautifulSoup(html, "html.parser")
+    async def parse(
+        self, html: str, parser: str | None = None
+    ) -> AsyncGenerator[URLRecord | None, None]:
+        soup = await parse_html_async(html, parser)
 
         h1_element = soup.find("h1")
 
@@ -88,5 +90,10 @@ class RecordingPages(Scraper):
 
                 url = f"{self.url}?{urlencode(self.get_params(value))}"
                 yield URLRecord(
-                    url=HttpUrl(url), metadata=MetaData(name=h1_text, snapshot=date_obj)
+                    url=HttpUrl(url),
+                    metadata=MetaData(
+                        name=h1_text,
+                        snapshot=date_obj,
+                        audio_profile=self.metadata.audio_profile,
+                    ),
                 )
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database import NRSRTranscript
 
+from ..http_cache import HTTPCache
 from ..link_queue.schemas import MetaData, URLRecord
 from .parent import Scraper
 
@@ -22,19 +23,17 @@ class TranscriptDownloader(Scraper):
         self.metadata = data.metadata
 
     async def scrape(
-        self, client: ClientSession
+        self, client: ClientSession, cache: HTTPCache | None = None
     ) -> AsyncGenerator[NRSRTranscript, None]:
-        async with client.get(self.url) as response:
-            content = await response.read()
-            content_type = response.headers.get("Content-Type", "")
-            extension = self.get_extension_from_content_type(content_type)
-            yield NRSRTranscript(
-                meeting_name=self.metadata.name,
-                meeting_num=await self.get_meeting_num(),
-                snapshot=self.metadata.snapshot if self.metadata.snapshot else None,
-                scraped_file=content,
-                scraped_file_type=extension,
-            )
+        content, content_type = await self.fetch_bytes(self.url, client, cache)
+        extension = self.get_extension_from_content_type(content_type)
+        yield NRSRTranscript(
+            meeting_name=self.metadata.name,
+            meeting_num=await self.get_meeting_num(),
+            snapshot=self.metadata.snapshot if self.metadata.snapshot else None,
+            scraped_file=content,
+            scraped_file_type=extension,
+        )
 
     async def save(self, item: NRSRTranscript, session: AsyncSession, **kwargs):
         async with session.begin():
@@ -1,17 +1,22 @@
 import asyncio
+import os
 import re
+import shutil
 from pathlib import Path
 from urllib.parse import urljoin
 
-import aiofiles
 import structlog
 from aiohttp import ClientSession
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database import NRSRRecording
 from src.extractors.utils import AudioAnalyzer
+from src.schemas import AUDIO_PROFILES, AudioProfile
 
+from ..hls_fetcher import HLSFetcher
+from ..http_cache import HTTPCache
 from ..link_queue import MetaData, NRSRRecordingData, URLRecord
+from ..rate_limiter import RateLimiter
 from .parent import Scraper
 
 logger = structlog.get_logger()
@@ -27,19 +32,29 @@ class VideoDownloader(Scraper):
         self.video_recording_url = None
         self.metadata = data.metadata
 
-    async def scrape(self, client: ClientSession):
-        async with client.get(self.url) as response:
-            content = await response.text()
+    async def scrape(
+        self,
+        client: ClientSession,
+        folder: str,
+        cache: HTTPCache | None = None,
+        segment_workers: int = 8,
+        rate_limiter: RateLimiter | None = None,
+        segment_rate: tuple[float, int] = (8.0, 8),
+    ):
+        content = await self.fetch_text(self.url, client, cache)
 
         playlist_url = await self.parse_playlist(content)
 
-        async with client.get(playlist_url) as response:
-            content = await response.text()
+        content = await self.fetch_text(playlist_url, client, cache)
 
         chunklist_url = await self.get_chunklist_url(playlist_url, content)
 
-        await logger.ainfo(f"Extracting {self.url}")
-        result = await self.extract_audio_from_chunklist(chunklist_url)
+        content = await self.fetch_text(chunklist_url, client, cache)
+
+        ts_urls = self.get_ts_urls(chunklist_url, content)
+        if rate_limiter is not None and ts_urls:
+            # shared by all the downloaders, the pages keep their own budget
+            rate_limiter.override(ts_urls[0], *segment_rate)
 
         meeting_num = re.findall(r"(\d+)\.\s*schôdza", self.metadata.name)
 
@@ -49,18 +64,40 @@ class VideoDownloader(Scraper):
             await logger.aerror(f"Could not parse meeting num out of {self.url}")
             meeting_num = None
 
-        analyzed = AudioAnalyzer(result).analyze()
+        profile = AUDIO_PROFILES[self.metadata.audio_profile]
+        filename = self.get_filename(meeting_num)
+        # the download lands next to its final path, so that `save` only renames
+        part_path = Path(folder) / f"{filename}.{profile.extension}.part"
+        # segments are kept until the transcode succeeds, for resuming
+        work_dir = Path(folder) / ".segments" / filename
+
+        await logger.ainfo(f"Extracting {self.url}")
+        fetcher = HLSFetcher(
+            work_dir,
+            concurrency=segment_workers,
+            offline=cache is not None and cache.offline,
+            rate_limiter=rate_limiter,
+        )
+        segments_list = await fetcher.fetch(ts_urls)
+        await self.extract_audio_from_segments(segments_list, part_path, profile)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+        try:
+            analyzed = await asyncio.to_thread(AudioAnalyzer(part_path).analyze)
+        except Exception:
+            part_path.unlink(missing_ok=True)
+            raise
 
         duration, sampling_rate = analyzed.duration, analyzed.sampling_rate
-        size = len(result) / 1024**2
+        size = part_path.stat().st_size / 1024**2
 
         yield NRSRRecordingData(
-            audio=result,
+            audio_path=part_path,
             metadata=NRSRRecording(
                 meeting_name=self.metadata.name,
                 meeting_num=meeting_num,
                 snapshot=self.metadata.snapshot,
-                audio_format="mp3",
+                audio_format=profile.extension,
                 audio_size=size,
                 duration=duration,
                 sampling_rate=sampling_rate,
@@ -72,49 +109,68 @@ class VideoDownloader(Scraper):
         async with session.begin():
             session.add(item.metadata)
 
-        filename = (
-            f"{item.metadata.meeting_num}_{item.metadata.snapshot.strftime('%d-%m-%Y')}"
-        )
-        path = recording_folder / filename
+        filename = self.get_filename(item.metadata.meeting_num)  # type: ignore
+        path = recording_folder / f"{filename}.{item.metadata.audio_format}"
 
-        async with aiofiles.open(f"{path}.mp3", "wb") as file:
-            await file.write(item.audio)
+        os.replace(item.audio_path, path)
         await logger.ainfo(f"{filename} recording saved to the file system")
 
+    def get_filename(self, meeting_num: int | None) -> str:
+        return f"{meeting_num}_{self.metadata.snapshot.strftime('%d-%m-%Y')}"  # type: ignore
+
+    @classmethod
+    async def extract_audio_from_segments(
+        cls,
+        segments_list: Path,
+        output_path: Path,
+        profile: AudioProfile = AUDIO_PROFILES["mp3"],
+    ):
+        # one pass over the local segments with the concat demuxer
+        await cls.extract_audio(
+            ["-f", "concat", "-safe", "0", "-i", str(segments_list)],
+            output_path,
+            profile,
+        )
+
     @staticmethod
-    async def extract_audio_from_chunklist(chunklist_url: str) -> bytes:
+    async def extract_audio(
+        input_args: list[str], output_path: Path, profile: AudioProfile
+    ):
+        """
+        ffmpeg writes straight into `output_path`, so the memory used does
+        not grow with the length of the recording. The output has to be a
+        seekable file, FLAC writes its stream info header at the end.
+        """
         cmd = [
             "ffmpeg",
-            "-i",
-            chunklist_url,
-            "-vn",
-            "-acodec",
-            "libmp3lame",  # Use the MP3 encoder instead of pcm_s16le
-            "-ar",
-            "48000",
-            "-ac",
-            "2",
-            "-b:a",
-            "192k",  # Optional: set the audio bitrate
-            "-f",
-            "mp3",  # Set the output format to mp3
-            "pipe:1",
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-y",
+            *input_args,
+            *profile.ffmpeg_args(),
+            str(output_path),
         ]
 
         process = await asyncio.create_subprocess_exec(
             *cmd,
-            stdout=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
             stderr=asyncio.subprocess.PIPE,
         )
 
-        stdout, stderr = await process.communicate()
+        try:
+            _, stderr = await process.communicate()
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+            output_path.unlink(missing_ok=True)
+            raise
 
         if process.returncode != 0:
+            output_path.unlink(missing_ok=True)
             await logger.aerror("ffmpeg processing failed", error=stderr.decode())
             raise Exception(f"ffmpeg process failed: {stderr.decode()}")
 
-        return stdout
-
     @staticmethod
     def get_ts_urls(chunklist_url: str, content: str) -> list[str]:
         ts_files = [i for i in content.split("\n") if i and not i.startswith("#")]
@@ -0,0 +1 @@
+from .hls_fetcher import HLSFetcher
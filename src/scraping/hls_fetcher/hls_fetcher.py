@@ -0,0 +1,143 @@
+import asyncio
+import os
+from pathlib import Path
+
+import aiofiles
+import structlog
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+
+from ..http_cache import NotCachedError
+from ..rate_limiter import RateLimiter
+
+logger = structlog.get_logger()
+
+
+class HLSFetcher:
+    """
+    Downloads the `.ts` segments of an HLS chunklist concurrently into
+    `work_dir`. Segments already on disk are skipped, so an interrupted
+    download resumes where it stopped and a dropped connection costs a
+    single segment.
+
+    Without a `client` the segments go through a session of their own,
+    bounded by `concurrency` and throttled by `rate_limiter`, which should
+    give the media host a (rate, burst) of its own. Every segment request
+    gets `timeout` instead of the crawler's total timeout.
+
+    With `offline` set only the segments already on disk are used, missing
+    ones raise `NotCachedError`.
+    """
+
+    client: ClientSession | None
+    work_dir: Path
+    concurrency: int
+    retries: int
+    timeout: ClientTimeout
+    offline: bool
+    rate_limiter: RateLimiter | None
+
+    def __init__(
+        self,
+        work_dir: str | Path,
+        concurrency: int = 8,
+        retries: int = 3,
+        client: ClientSession | None = None,
+        timeout: ClientTimeout = ClientTimeout(total=120, sock_read=60),
+        offline: bool = False,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        self.client = client
+        self.work_dir = Path(work_dir)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.offline = offline
+        self.rate_limiter = rate_limiter
+
+    def segment_path(self, index: int) -> Path:
+        return self.work_dir / f"{index:06d}.ts"
+
+    async def fetch(self, ts_urls: list[str]) -> Path:
+        """
+        Fetches all the segments and returns an ffmpeg concat list of them.
+        """
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        pending = [
+            (index, url)
+            for index, url in enumerate(ts_urls)
+            if not self.segment_path(index).exists()
+        ]
+        await logger.ainfo(
+            "Fetching HLS segments",
+            work_dir=str(self.work_dir),
+            segments=len(ts_urls),
+            pending=len(pending),
+        )
+
+        if pending and self.offline:
+            raise NotCachedError(
+                f"{len(pending)} segments are missing in {self.work_dir}."
+            )
+        if pending:
+            if self.client is not None:
+                await self.fetch_all(self.client, pending, semaphore)
+            else:
+                trace_configs = (
+                    [self.rate_limiter.trace_config()] if self.rate_limiter else []
+                )
+                async with ClientSession(
+                    connector=TCPConnector(limit=self.concurrency),
+                    trace_configs=trace_configs,
+                ) as client:
+                    await self.fetch_all(client, pending, semaphore)
+
+        list_path = self.work_dir / "segments.txt"
+        list_path.write_text(
+            "".join(
+                f"file '{self.segment_path(index).resolve()}'\n"
+                for index in range(len(ts_urls))
+            )
+        )
+        return list_path
+
+    async def fetch_all(
+        self,
+        client: ClientSession,
+        pending: list[tuple[int, str]],
+        semaphore: asyncio.Semaphore,
+    ):
+        async def fetch_one(index: int, url: str):
+            async with semaphore:
+                await self.fetch_segment(client, url, self.segment_path(index))
+
+        async with asyncio.TaskGroup() as group:
+            for index, url in pending:
+                group.create_task(fetch_one(index, url))
+
+    async def fetch_segment(
+        self, client: ClientSession, url: str, path: Path, chunk_size: int = 64 * 1024
+    ):
+        tmp_path = path.with_suffix(".tmp")
+        for attempt in range(1, self.retries + 1):
+            try:
+                async with client.get(url, timeout=self.timeout) as response:
+                    response.raise_for_status()
+                    async with aiofiles.open(tmp_path, "wb") as file:
+                        async for chunk in response.content.iter_chunked(chunk_size):
+                            await file.write(chunk)
+                # only complete segments get their final name
+                os.replace(tmp_path, path)
+                return
+            except (ClientError, asyncio.TimeoutError) as e:
+                tmp_path.unlink(missing_ok=True)
+                if attempt == self.retries:
+                    raise
+                await logger.awarning(
+                    "Segment download failed, retrying",
+                    url=url,
+                    attempt=attempt,
+                    error=str(e),
+                )
+                await asyncio.sleep(2**attempt)
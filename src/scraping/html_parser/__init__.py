@@ -0,0 +1 @@
+from .html_parser import PARSER, available_parser, parse_html, parse_html_async
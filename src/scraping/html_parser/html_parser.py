@@ -0,0 +1,31 @@
+import asyncio
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+# fastest first, html.parser ships with Python and is always there
+PREFERRED_PARSERS = ("lxml", "html.parser")
+
+
+def available_parser() -> str:
+    for parser in PREFERRED_PARSERS:
+        if builder_registry.lookup(parser) is not None:
+            return parser
+    return "html.parser"
+
+
+PARSER = available_parser()
+
+
+def parse_html(html: str | bytes, parser: str | None = None) -> BeautifulSoup:
+    return BeautifulSoup(html, parser or PARSER)
+
+
+async def parse_html_async(
+    html: str | bytes, parser: str | None = None
+) -> BeautifulSoup:
+    """
+    Builds the tree in a worker thread, so that parsing a large page does
+    not stall the other crawlers on the event loop.
+    """
+    return await asyncio.to_thread(parse_html, html, parser)
@@ -0,0 +1 @@
+from .http_cache import CachedResponse, HTTPCache, NotCachedError
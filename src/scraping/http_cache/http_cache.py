@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import structlog
+from aiohttp import ClientSession
+from pydantic import BaseModel
+
+logger = structlog.get_logger()
+
+
+class NotCachedError(FileNotFoundError):
+    """
+    Raised in offline mode for anything that would need the network.
+    """
+
+
+class CachedResponse(BaseModel):
+    url: str
+    etag: str | None
+    last_modified: str | None
+    encoding: str
+    fetched_at: datetime
+    content_type: str | None = None
+
+
+class HTTPCache:
+    """
+    On-disk cache of crawled pages keyed by the sha256 of the url. A cached
+    page is revalidated with its ETag / Last-Modified, so an unchanged page
+    costs a 304 instead of the whole body.
+
+    In `offline` mode the network is never touched and pages missing from
+    the cache raise `NotCachedError`. Crawlers fetching without the cache
+    call `check_online` first, so that they fail the same way.
+    """
+
+    root: Path
+    offline: bool
+
+    def __init__(self, root: str | Path = "data/http_cache", offline: bool = False):
+        self.root = Path(root)
+        self.offline = offline
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def paths(self, url: str) -> tuple[Path, Path]:
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        folder = self.root / digest[:2]
+        return folder / f"{digest}.body", folder / f"{digest}.json"
+
+    def read(self, url: str) -> tuple[CachedResponse, bytes] | None:
+        body_path, meta_path = self.paths(url)
+        if not meta_path.exists() or not body_path.exists():
+            return None
+        meta = CachedResponse.model_validate_json(meta_path.read_bytes())
+        return meta, body_path.read_bytes()
+
+    def write(self, meta: CachedResponse, body: bytes):
+        body_path, meta_path = self.paths(meta.url)
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        # the body goes first, the meta file marks the entry as complete
+        for path, content in [
+            (body_path, body),
+            (meta_path, meta.model_dump_json().encode()),
+        ]:
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    file.write(content)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def check_online(self, url: str):
+        if self.offline:
+            raise NotCachedError(f"{url} is not in the HTTP cache.")
+
+    async def get_text(self, url: str, client: ClientSession) -> str:
+        meta, body = await self.get(url, client)
+        return body.decode(meta.encoding, errors="replace")
+
+    async def get(
+        self, url: str, client: ClientSession
+    ) -> tuple[CachedResponse, bytes]:
+        cached = await asyncio.to_thread(self.read, url)
+
+        if self.offline:
+            if cached is None:
+                self.check_online(url)
+            return cached  # type: ignore
+
+        headers = {}
+        if cached is not None:
+            meta, _ = cached
+            if meta.etag:
+                headers["If-None-Match"] = meta.etag
+            if meta.last_modified:
+                headers["If-Modified-Since"] = meta.last_modified
+
+        async with client.get(url, headers=headers) as response:
+            if response.status == 304 and cached is not None:
+                await logger.adebug("Page not modified", url=url)
+                return cached
+
+            body = await response.read()
+            meta = CachedResponse(
+                url=url,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                encoding=response.get_encoding(),
+                fetched_at=datetime.now(),
+                content_type=response.headers.get("Content-Type"),
+            )
+            if response.status == 200:
+                await asyncio.to_thread(self.write, meta, body)
+
+        return meta, body
@@ -1,2 +1,3 @@
 from .link_queue import LinkQueue
+from .run_lock import RunLock
 from .schemas import MetaData, URLRecord, NRSRMeetingRecord, NRSRRecordingData
@@ -1,3 +1,4 @@
+import time
 from typing import Any
 
 import structlog
@@ -7,46 +8,290 @@ from .schemas import URLRecord
 
 logger = structlog.get_logger(level="INFO")
 
+# end-of-stream marker, one is consumed by every worker of the closed queue
+EOS = b"__end_of_stream__"
+
+# Moves items with an expired lease from the processing list back to the
+# tail of the queue. Items found without any lease (the worker died between
+# BLMOVE and ZADD) get a lease first, so they are requeued only if nobody
+# acknowledges them in time. In a closed queue the items go ahead of the
+# end-of-stream markers ARGV[3] instead, the workers would stop before them.
+REQUEUE_EXPIRED = """
+local items = redis.call('LRANGE', KEYS[2], 0, -1)
+local closed = redis.call('LPOS', KEYS[1], ARGV[3])
+local requeued = 0
+for _, item in ipairs(items) do
+    local deadline = redis.call('ZSCORE', KEYS[3], item)
+    if not deadline then
+        redis.call('ZADD', KEYS[3], ARGV[2], item)
+    elseif tonumber(deadline) <= tonumber(ARGV[1]) then
+        redis.call('LREM', KEYS[2], 1, item)
+        redis.call('ZREM', KEYS[3], item)
+        if closed then
+            redis.call('RPUSH', KEYS[1], item)
+        else
+            redis.call('LPUSH', KEYS[1], item)
+        end
+        requeued = requeued + 1
+    end
+end
+return requeued
+"""
+
+# Releases the leased item ARGV[2] back to the queue, like REQUEUE_EXPIRED
+# ahead of the end-of-stream markers ARGV[1] when the queue is closed.
+RELEASE = """
+redis.call('LREM', KEYS[2], 1, ARGV[2])
+redis.call('ZREM', KEYS[3], ARGV[2])
+if redis.call('LPOS', KEYS[1], ARGV[1]) then
+    redis.call('RPUSH', KEYS[1], ARGV[2])
+else
+    redis.call('LPUSH', KEYS[1], ARGV[2])
+end
+"""
+
+# Drops the end-of-stream markers ARGV[1] of a previous run and returns all
+# the items it left leased to the head of the queue, expired or not.
+REOPEN = """
+redis.call('LREM', KEYS[1], 0, ARGV[1])
+local items = redis.call('LRANGE', KEYS[2], 0, -1)
+local reclaimed = 0
+for i = #items, 1, -1 do
+    if items[i] ~= ARGV[1] then
+        redis.call('RPUSH', KEYS[1], items[i])
+        reclaimed = reclaimed + 1
+    end
+end
+redis.call('DEL', KEYS[2], KEYS[3])
+return reclaimed
+"""
+
+# Registers and enqueues urls that are not in the registry yet, in one
+# round-trip and without a race between the check and the push.
+# ARGV holds url, payload pairs.
+ADD_UNIQUE = """
+local added = {}
+for i = 1, #ARGV, 2 do
+    if redis.call('SADD', KEYS[1], ARGV[i]) == 1 then
+        redis.call('LPUSH', KEYS[2], ARGV[i + 1])
+        added[#added + 1] = 1
+    else
+        added[#added + 1] = 0
+    end
+end
+return added
+"""
+
+# Claims up to ARGV[1] items at once and leases them until ARGV[2].
+# Stops at the end-of-stream marker ARGV[3] and puts it back, together
+# with everything popped after it, so that `pop` consumes it.
+POP_MANY = """
+local popped = redis.call('LMPOP', 1, KEYS[1], 'RIGHT', 'COUNT', ARGV[1])
+if not popped then
+    return {}
+end
+local items = popped[2]
+local claimed = {}
+for i, item in ipairs(items) do
+    if item == ARGV[3] then
+        for j = #items, i, -1 do
+            redis.call('RPUSH', KEYS[1], items[j])
+        end
+        break
+    end
+    redis.call('LPUSH', KEYS[2], item)
+    redis.call('ZADD', KEYS[3], ARGV[2], item)
+    claimed[#claimed + 1] = item
+end
+return claimed
+"""
+
 
 class LinkQueue:
+    """
+    Redis backed FIFO queue with leases. A popped item is moved to the
+    processing list and stays there until it is acknowledged; items whose
+    lease expires (e.g. the worker was killed) are requeued.
+
+    A producer ends the stream with `close`, after which `pop` returns None.
+    With `pop_timeout=0` an empty queue blocks until an item or the
+    end-of-stream marker arrives.
+    """
+
     id: str
     client: Redis
+    lease_seconds: float
+    reap_interval: float
+    pop_timeout: float
 
-    def __init__(self, id: str, redis_client: Redis) -> None:
+    def __init__(
+        self,
+        id: str,
+        redis_client: Redis,
+        lease_seconds: float = 600,
+        reap_interval: float = 30,
+        pop_timeout: float = 1,
+    ) -> None:
         self.id = id
         self.registry_key = f"{id}_registry"
+        self.processing_key = f"{id}_processing"
+        self.leases_key = f"{id}_leases"
         self.client = redis_client
+        self.lease_seconds = lease_seconds
+        self.reap_interval = reap_interval
+        self.pop_timeout = pop_timeout
+        self.last_reap = 0.0
+        # raw payloads of the items leased by this process, keyed by url
+        self.leased: dict[str, bytes] = {}
+        self.requeue_script = self.client.register_script(REQUEUE_EXPIRED)
+        self.add_script = self.client.register_script(ADD_UNIQUE)
+        self.pop_many_script = self.client.register_script(POP_MANY)
+        self.release_script = self.client.register_script(RELEASE)
+        self.reopen_script = self.client.register_script(REOPEN)
 
     async def add(self, records: URLRecord | list[URLRecord]):
         if not isinstance(records, list):
             records = [records]
+        if not records:
+            return
 
-        async with self.client.pipeline() as pipe:
-            for record in records:
-                pipe.sismember(self.registry_key, str(record.url))
-            result = await pipe.execute()
+        args = []
+        for record in records:
+            args.extend([str(record.url), record.model_dump_json()])
+        added = await self.add_script(keys=[self.registry_key, self.id], args=args)
 
-        async with self.client.pipeline() as pipe:
-            for record, already_in in zip(records, result):
-                if already_in:
-                    logger.warning(f"{record} is already in. Skipping")
-                else:
-                    pipe.sadd(self.registry_key, str(record.url))
-                    pipe.lpush(self.id, record.model_dump_json())
-            await pipe.execute()
+        for record, was_added in zip(records, added):
+            if not was_added:
+                logger.warning(f"{record} is already in. Skipping")
 
     async def check_registry(self, url: str) -> bool:
         return bool(await self.client.sismember(self.registry_key, url))  # type: ignore
 
-    async def rollback(self, record: URLRecord):
+    async def requeue_expired(self) -> int:
+        now = time.time()
+        requeued = await self.requeue_script(
+            keys=[self.id, self.processing_key, self.leases_key],
+            args=[now, now + self.lease_seconds, EOS],
+        )
+        self.last_reap = now
+        if requeued:
+            logger.warning(f"{requeued} expired items requeued in {self.id}")
+        return requeued
+
+    async def ack(self, record: URLRecord):
+        raw = self.leased.pop(str(record.url), None)
+        if raw is None:
+            return
+
+        async with self.client.pipeline() as pipe:
+            pipe.lrem(self.processing_key, 1, raw)
+            pipe.zrem(self.leases_key, raw)
+            await pipe.execute()
+
+    async def skip(self, record: URLRecord):
+        """
+        Acknowledges an item that could not be processed and drops it from
+        the registry, so that a later run enqueues it again.
+        """
+        await self.ack(record)
+        await self.client.srem(self.registry_key, str(record.url))  # type: ignore
+
+    async def extend(self, *records: URLRecord):
+        deadline = time.time() + self.lease_seconds
+        raws = [self.leased.get(str(record.url)) for record in records]
+        mapping = {raw: deadline for raw in raws if raw is not None}
+        if mapping:
+            await self.client.zadd(self.leases_key, mapping, xx=True)
+
+    async def rollback(self, record: URLRecord | None):
+        if record is None:
+            return
+        raw = self.leased.pop(str(record.url), None)
+        if raw is None:
+            # not leased by this process, the reaper takes care of it
+            return
         logger.warning(f"{record} is being rolled back")
-        await self.client.rpush(self.id, record.model_dump_json())  # type: ignore
 
-    async def pop(self) -> Any:
-        record = await self.client.brpop(self.id, timeout=1)  # type: ignore
-        if not record:
+        # back to the tail of the queue, so the item is not popped straight
+        # back, but ahead of the markers of a closed queue
+        await self.release_script(
+            keys=[self.id, self.processing_key, self.leases_key], args=[EOS, raw]
+        )
+
+    async def close(self, consumers: int = 1):
+        """
+        Ends the stream for `consumers` workers, behind the queued items.
+        """
+        if consumers < 1:
+            return
+        await self.client.lpush(self.id, *[EOS] * consumers)  # type: ignore
+
+    async def reopen(self) -> int:
+        """
+        Prepares the queue for a new run: drops the end-of-stream markers
+        of an interrupted run and requeues everything it left leased, so
+        nothing ends up behind the markers of this run. Only safe while no
+        other run consumes the queue, i.e. under a `RunLock`.
+        """
+        reclaimed = await self.reopen_script(
+            keys=[self.id, self.processing_key, self.leases_key], args=[EOS]
+        )
+        self.leased.clear()
+        if reclaimed:
+            logger.warning(f"{reclaimed} leased items reclaimed in {self.id}")
+        return reclaimed
+
+    async def pop(self, timeout: float | None = None) -> Any:
+        timeout = self.pop_timeout if timeout is None else timeout
+        while True:
+            if time.time() - self.last_reap > self.reap_interval:
+                await self.requeue_expired()
+
+            # a blocking pop wakes up regularly to requeue expired leases
+            raw = await self.client.blmove(
+                self.id,
+                self.processing_key,
+                timeout or self.reap_interval,
+                src="RIGHT",
+                dest="LEFT",
+            )  # type: ignore
+            if raw or timeout:
+                break
+
+        if not raw:
+            return None
+        if raw == EOS:
+            await self.client.lrem(self.processing_key, 1, EOS)  # type: ignore
             return None
-        return URLRecord.model_validate_json(record[1])
+
+        await self.client.zadd(self.leases_key, {raw: time.time() + self.lease_seconds})
+        return self._lease(raw)
+
+    async def pop_many(self, n: int, timeout: float | None = None) -> list[URLRecord]:
+        """
+        Claims up to `n` items in one round-trip. When the queue is empty,
+        blocks like `pop` for the first item and then claims the rest.
+        """
+        raws = await self._pop_many(n)
+        if raws:
+            return [self._lease(raw) for raw in raws]
+
+        first = await self.pop(timeout)
+        if first is None:
+            return []
+        rest = await self._pop_many(n - 1) if n > 1 else []
+        return [first, *[self._lease(raw) for raw in rest]]
+
+    async def _pop_many(self, n: int) -> list[bytes]:
+        return await self.pop_many_script(
+            keys=[self.id, self.processing_key, self.leases_key],
+            args=[n, time.time() + self.lease_seconds, EOS],
+        )
+
+    def _lease(self, raw: bytes) -> URLRecord:
+        record = URLRecord.model_validate_json(raw)
+        self.leased[str(record.url)] = raw
+        return record
 
     async def length(self):
         return await self.client.llen(self.id)  # type: ignore
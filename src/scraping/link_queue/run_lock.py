@@ -0,0 +1,87 @@
+import asyncio
+import time
+import uuid
+
+import structlog
+from redis.asyncio import Redis
+
+logger = structlog.get_logger()
+
+# Extends / deletes the lock only while it still holds our token, so a run
+# whose lock expired can not touch the lock of the run that took over.
+REFRESH = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RunLock:
+    """
+    Redis lock held by a crawler run for its whole duration, refreshed in
+    the background. A killed run stops refreshing and its lock expires
+    after `ttl` seconds, so a new run waits at most that long before it
+    may treat the previous run as dead.
+    """
+
+    client: Redis
+    key: str
+    ttl: int
+    token: str
+
+    def __init__(self, client: Redis, key: str = "scraper_run_lock", ttl: int = 60):
+        self.client = client
+        self.key = key
+        self.ttl = ttl
+        self.token = uuid.uuid4().hex
+        self.heartbeat: asyncio.Task | None = None
+        self.refresh_script = self.client.register_script(REFRESH)
+        self.release_script = self.client.register_script(RELEASE)
+
+    async def acquire(self, timeout: float | None = None):
+        """
+        Waits for the lock. Gives up after `timeout` seconds, by default a
+        bit longer than it takes the lock of a dead run to expire.
+        """
+        timeout = self.ttl + 5 if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waiting = False
+        while not await self.client.set(self.key, self.token, nx=True, ex=self.ttl):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Another run holds {self.key}, not starting.")
+            if not waiting:
+                await logger.awarning("Waiting for the run lock", key=self.key)
+                waiting = True
+            await asyncio.sleep(1)
+
+        self.heartbeat = asyncio.create_task(self.keep())
+
+    async def keep(self):
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            if not await self.refresh_script(
+                keys=[self.key], args=[self.token, self.ttl]
+            ):
+                await logger.aerror("Run lock lost", key=self.key)
+                return
+
+    async def release(self):
+        if self.heartbeat is not None:
+            self.heartbeat.cancel()
+            self.heartbeat = None
+        await self.release_script(keys=[self.key], args=[self.token])
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        await self.release()
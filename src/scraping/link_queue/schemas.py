@@ -1,4 +1,5 @@
 from datetime import datetime
+from pathlib import Path
 
 from pydantic import BaseModel, Field, HttpUrl
 
@@ -9,6 +10,8 @@ class MetaData(BaseModel):
     name: str
     category: str | None = Field(default=None)
     snapshot: datetime | None = Field(default=None)
+    # key of `src.schemas.AUDIO_PROFILES` the recordings are downloaded in
+    audio_profile: str = Field(default="mp3")
 
 
 class URLRecord(BaseModel):
@@ -24,7 +27,8 @@ class NRSRMeetingRecord(BaseModel):
 
 
 class NRSRRecordingData(BaseModel):
-    audio: bytes
+    # finished download waiting for `VideoDownloader.save` to rename it
+    audio_path: Path
     metadata: NRSRRecording
 
     class Config:
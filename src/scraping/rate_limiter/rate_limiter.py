@@ -0,0 +1,176 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+import structlog
+from aiohttp import (
+    ClientSession,
+    TraceConfig,
+    TraceRequestEndParams,
+    TraceRequestStartParams,
+)
+
+logger = structlog.get_logger()
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average and bursts of up to `burst`
+    requests. Waiters are served one by one in the order they arrived.
+    """
+
+    rate: float
+    burst: int
+    tokens: float
+    updated: float
+    blocked_until: float
+    failures: int
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.failures = 0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def block(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        # nothing saved up during the pause may be spent in one burst after it
+        self.tokens = 0
+        self.updated = self.blocked_until
+
+
+class RateLimiter:
+    """
+    Shared per-host rate limiter. Every host gets its own token bucket,
+    `overrides` maps a host to its own (rate, burst). Crawlers that find
+    a host at runtime, e.g. the media host of a recording, register it
+    with `override`.
+
+    A 429 or 5xx response pauses the host for its Retry-After, or for an
+    exponentially growing backoff when the header is missing.
+    """
+
+    rate: float
+    burst: int
+    overrides: dict[str, tuple[float, int]]
+    backoff: float
+    max_backoff: float
+    buckets: dict[str, TokenBucket]
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 1,
+        overrides: dict[str, tuple[float, int]] | None = None,
+        backoff: float = 2.0,
+        max_backoff: float = 120.0,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides or {}
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.buckets = {}
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).hostname or ""
+        if host not in self.buckets:
+            rate, burst = self.overrides.get(host, (self.rate, self.burst))
+            self.buckets[host] = TokenBucket(rate, burst)
+        return self.buckets[host]
+
+    def override(self, url: str, rate: float, burst: int):
+        """
+        Gives the host of `url` its own (rate, burst), unless it already
+        has an override configured.
+        """
+        host = urlsplit(url).hostname or ""
+        if host in self.overrides:
+            return
+        self.overrides[host] = (rate, burst)
+        previous = self.buckets.get(host)
+        self.buckets[host] = TokenBucket(rate, burst)
+        if previous is not None:
+            # a backoff in progress carries over
+            self.buckets[host].blocked_until = previous.blocked_until
+            self.buckets[host].failures = previous.failures
+
+    async def acquire(self, url: str):
+        await self.bucket(url).acquire()
+
+    async def report(self, url: str, status: int, retry_after: str | None = None):
+        bucket = self.bucket(url)
+        if status != 429 and status < 500:
+            bucket.failures = 0
+            return
+
+        bucket.failures += 1
+        delay = self.parse_retry_after(retry_after)
+        if delay is None:
+            delay = min(self.backoff * 2 ** (bucket.failures - 1), self.max_backoff)
+        bucket.block(delay)
+        await logger.awarning(
+            "Backing off host", url=url, status=status, seconds=round(delay, 1)
+        )
+
+    def trace_config(self) -> TraceConfig:
+        """
+        Hooks the limiter into every request of a `ClientSession`.
+        """
+
+        async def on_request_start(
+            session: ClientSession,
+            context: SimpleNamespace,
+            params: TraceRequestStartParams,
+        ):
+            await self.acquire(str(params.url))
+
+        async def on_request_end(
+            session: ClientSession,
+            context: SimpleNamespace,
+            params: TraceRequestEndParams,
+        ):
+            await self.report(
+                str(params.url),
+                params.response.status,
+                params.response.headers.get("Retry-After"),
+            )
+
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+    @staticmethod
+    def parse_retry_after(value: str | None) -> float | None:
+        if not value:
+            return None
+        if value.strip().isdigit():
+            return float(value)
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(date.timestamp() - time.time(), 0.0)
@@ -0,0 +1,2 @@
+from .audio_cache import AudioCache
+from .blob_store import BlobRef, BlobStore
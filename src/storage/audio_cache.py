@@ -0,0 +1,159 @@
+import hashlib
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import structlog
+from pydantic import BaseModel
+
+logger = structlog.get_logger()
+
+
+class CacheEntry(BaseModel):
+    source: str
+    source_mtime_ns: int
+    source_size: int
+    samples: int
+
+
+class AudioCache:
+    """
+    Decodes every source file once into 16 kHz mono int16 PCM and hands out
+    read-only memory maps of it. An entry is valid while the source keeps
+    its mtime and size; least recently used entries are evicted once the
+    cache grows over `max_bytes`.
+    """
+
+    SAMPLE_RATE: int = 16000
+    root: Path
+    max_bytes: int
+
+    def __init__(self, root: str | Path, max_bytes: int = 200 * 1024**3) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def paths(self, file_path: str) -> tuple[Path, Path]:
+        key = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()
+        return self.root / f"{key}.pcm", self.root / f"{key}.json"
+
+    def load(self, file_path: str) -> np.ndarray:
+        pcm_path, meta_path = self.paths(file_path)
+        stat = os.stat(file_path)
+
+        entry = None
+        if meta_path.exists() and pcm_path.exists():
+            entry = CacheEntry.model_validate_json(meta_path.read_bytes())
+            if (
+                entry.source_mtime_ns != stat.st_mtime_ns
+                or entry.source_size != stat.st_size
+            ):
+                logger.debug("Cached audio is stale", file_path=file_path)
+                entry = None
+
+        if entry is None:
+            logger.debug("Decoding audio into cache", file_path=file_path)
+            entry = self.decode(file_path, pcm_path, stat)
+            self.write_meta(meta_path, entry)
+            self.evict(keep=pcm_path)
+        else:
+            # the access time drives the eviction order
+            os.utime(pcm_path)
+
+        if entry.samples == 0:
+            return np.zeros(0, dtype=np.int16)
+        return np.memmap(pcm_path, dtype=np.int16, mode="r")
+
+    def load_float(self, file_path: str) -> np.ndarray:
+        """
+        Same samples scaled to float32 in [-1, 1), as whisperx `load_audio`.
+        """
+        return self.load(file_path).astype(np.float32) / 32768.0
+
+    @classmethod
+    def command(cls, file_path: str) -> list[str]:
+        """
+        The ffmpeg command decoding `file_path` to the cached PCM format.
+        """
+        return [
+            "ffmpeg",
+            "-nostdin",
+            "-threads",
+            "0",
+            "-i",
+            file_path,
+            "-f",
+            "s16le",
+            "-ac",
+            "1",
+            "-acodec",
+            "pcm_s16le",
+            "-ar",
+            str(cls.SAMPLE_RATE),
+            "-",
+        ]
+
+    @classmethod
+    def decode_uncached(cls, file_path: str) -> np.ndarray:
+        """
+        Decodes into memory in the same format, without a cache directory.
+        """
+        process = subprocess.run(
+            cls.command(file_path), capture_output=True, check=True
+        )
+        return np.frombuffer(process.stdout, np.int16)
+
+    def decode(self, file_path: str, pcm_path: Path, stat: os.stat_result):
+        cmd = self.command(file_path)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                # ffmpeg writes straight into the file, nothing is buffered here
+                subprocess.run(cmd, stdout=file, stderr=subprocess.PIPE, check=True)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, pcm_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        return CacheEntry(
+            source=os.path.abspath(file_path),
+            source_mtime_ns=stat.st_mtime_ns,
+            source_size=stat.st_size,
+            samples=size // 2,
+        )
+
+    def write_meta(self, meta_path: Path, entry: CacheEntry):
+        # other processes read the entry while it is written
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                file.write(entry.model_dump_json())
+            os.replace(tmp_path, meta_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def evict(self, keep: Path | None = None):
+        entries = []
+        total = 0
+        for pcm_path in self.root.glob("*.pcm"):
+            try:
+                stat = pcm_path.stat()
+            except FileNotFoundError:
+                # evicted by another process meanwhile
+                continue
+            entries.append((stat.st_mtime, stat.st_size, pcm_path))
+            total += stat.st_size
+
+        for _, size, pcm_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if pcm_path == keep:
+                continue
+            logger.debug("Evicting cached audio", path=str(pcm_path))
+            pcm_path.unlink(missing_ok=True)
+            pcm_path.with_suffix(".json").unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,68 @@
+import hashlib
+import mmap
+import os
+import tempfile
+from pathlib import Path
+
+from pydantic import BaseModel
+
+
+class BlobRef(BaseModel):
+    hash: str
+    offset: int
+    length: int
+
+
+class BlobStore:
+    """
+    Content-addressed file store. A blob is saved under its sha256 digest,
+    sharded into `depth` levels of two-character directories, e.g.
+    `root/ab/cd/abcd...`. Writing the same content twice is a no-op.
+    """
+
+    root: Path
+    depth: int
+
+    def __init__(self, root: str | Path, depth: int = 2) -> None:
+        self.root = Path(root)
+        self.depth = depth
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest: str) -> Path:
+        shards = [digest[i * 2 : i * 2 + 2] for i in range(self.depth)]
+        return self.root.joinpath(*shards, digest)
+
+    def put(self, data: bytes) -> BlobRef:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write next to the target and rename, readers never see partial blobs
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    file.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+        return BlobRef(hash=digest, offset=0, length=len(data))
+
+    def open(self, digest: str, offset: int = 0, length: int | None = None):
+        """
+        Returns a read-only memoryview over the memory-mapped blob,
+        no audio is copied until the caller reads it.
+        """
+        with open(self.path(digest), "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size == 0:
+                return memoryview(b"")
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        end = size if length is None else offset + length
+        return memoryview(mapped)[offset:end]
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).is_file()
@@ -0,0 +1,11 @@
+import os
+
+# `src` reads its database settings on import, the tests never connect
+for key, value in {
+    "DB_USERNAME": "test",
+    "DB_PASSWORD": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+}.items():
+    os.environ.setdefault(key, value)
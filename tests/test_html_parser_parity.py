@@ -0,0 +1,128 @@
+"""
+The crawlers must extract the same records whichever HTML parser builds
+the tree. Pages under `fixtures/html` are named after the crawler reading
+them; pages saved by the HTTP cache can be dropped in the same way.
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from bs4.builder import builder_registry
+
+from src.scraping.crawlers import NRSRMembers, RecordingPages, TermsRecording
+from src.scraping.html_parser import parse_html
+from src.scraping.link_queue import MetaData, URLRecord
+
+FIXTURES = Path(__file__).parent / "fixtures" / "html"
+
+pytestmark = pytest.mark.skipif(
+    builder_registry.lookup("lxml") is None, reason="lxml is not installed"
+)
+
+
+def extract_terms(html: str, parser: str):
+    crawler = TermsRecording(
+        URLRecord(
+            url="https://tv.nrsr.sk/archiv/schodza/9",  # type: ignore
+            metadata=MetaData(name="nrsr2023"),
+        )
+    )
+    soup = parse_html(html, parser)
+
+    async def collect():
+        return [i.model_dump(mode="json") async for i in crawler.parse_meetings(soup)]
+
+    return asyncio.run(collect()), crawler.get_next_page(soup)
+
+
+def extract_recording(html: str, parser: str):
+    crawler = RecordingPages(
+        URLRecord(
+            url="https://tv.nrsr.sk/archiv/schodza/9/35",  # type: ignore
+            metadata=MetaData(name="35. schôdza"),
+        )
+    )
+
+    async def collect():
+        return [
+            i.model_dump(mode="json") if i else None
+            async for i in crawler.parse(html, parser)
+        ]
+
+    return asyncio.run(collect())
+
+
+def extract_members(html: str, parser: str):
+    crawler = NRSRMembers(
+        URLRecord(
+            url="https://www.nrsr.sk/web/Default.aspx?sid=poslanci/zoznam_abc",  # type: ignore
+            metadata=MetaData(name="9"),
+        )
+    )
+
+    async def collect():
+        return [(i.name, i.surname, i.term) async for i in crawler.parse(html, parser)]
+
+    return asyncio.run(collect())
+
+
+EXTRACTORS = {
+    "terms": extract_terms,
+    "recording": extract_recording,
+    "members": extract_members,
+}
+
+
+def fixture_pages() -> list[Path]:
+    return sorted(
+        path
+        for path in FIXTURES.glob("*.html")
+        if path.name.split("_", 1)[0] in EXTRACTORS
+    )
+
+
+@pytest.mark.parametrize("page", fixture_pages(), ids=lambda path: path.stem)
+def test_lxml_matches_html_parser(page: Path):
+    extract = EXTRACTORS[page.name.split("_", 1)[0]]
+    html = page.read_text(encoding="utf-8")
+
+    assert extract(html, "lxml") == extract(html, "html.parser")
+
+
+def test_terms_fixture_is_read():
+    html = (FIXTURES / "terms_schodza_9.html").read_text(encoding="utf-8")
+    meetings, next_page = extract_terms(html, "lxml")
+
+    # the heading without a link and the one without a date are skipped
+    assert [i["url"] for i in meetings] == [
+        "https://tv.nrsr.sk/archiv/schodza/9/35",
+        "https://tv.nrsr.sk/archiv/schodza/9/34",
+        "https://tv.nrsr.sk/archiv/schodza/9/33?view=all",
+    ]
+    assert next_page == "https://tv.nrsr.sk/archiv/schodza/9?page=2"
+
+    html = (FIXTURES / "terms_schodza_9_last.html").read_text(encoding="utf-8")
+    assert extract_terms(html, "lxml")[1] is None
+
+
+def test_recording_fixture_is_read():
+    html = (FIXTURES / "recording_schodza_9_35.html").read_text(encoding="utf-8")
+    records = extract_recording(html, "lxml")
+
+    assert [i["metadata"]["snapshot"][:10] for i in records] == [
+        "2025-05-21",
+        "2025-05-22",
+        "2025-05-23",
+        "2025-05-27",
+    ]
+    assert records[0]["url"].endswith("?MeetingDate=21052025&DisplayChairman=true")
+
+
+def test_members_fixture_is_read():
+    html = (FIXTURES / "members_obdobie_9.html").read_text(encoding="utf-8")
+    members = extract_members(html, "lxml")
+
+    assert len(members) == 7
+    assert ("Lucia", "Duriš Nicholsonová", 9) in members
+    assert ("Meno bez čiarky", "", 9) in members